@@ -22,14 +22,13 @@ for elr, yardage_interval in routes:
     print(f"\nCo-ordinates of ELR {elr} at maximum {yardage_interval} yard intervals")
     print("ELR   Mileage     Easting      Northing     Longitude   Latitude")
 
-    for total_yards in gf.traverse(elr, yardage_interval):
-        miles, yards = gf.split_total_yards(total_yards)
-        easting_northing = gf.at(elr, miles * 1760 + yards, lon_lat=False)
-        geographic = gf.at(elr, miles * 1760 + yards, lon_lat=True)
-        mileage = gf.format_mileage(miles, yards)
-        print(
-            f"{elr:<4}  {mileage:<10} {easting_northing.x:>11.3f}m {easting_northing.y:>11.3f}m  {geographic.x:>9.6f}°  {geographic.y:>9.6f}°"
-        )
+    # Each chunk holds the planar and geographic co-ordinates of the points, so each point is computed only once.
+    for points in gf.traverse_points(elr, yardage_interval):
+        for total_yards, easting, northing, longitude, latitude in zip(
+            points.total_yards, points.easting, points.northing, points.longitude, points.latitude
+        ):
+            mileage = gf.format_total_yards(int(total_yards))
+            print(f"{elr:<4}  {mileage:<10} {easting:>11.3f}m {northing:>11.3f}m  {longitude:>9.6f}°  {latitude:>9.6f}°")
 
 
 """
@@ -1,10 +1,8 @@
 # Example showing how to export ELR co-ordinates to GeoJSON files at varying intervals.
-# NOTE requires installation of the geopandas library.
+# Each file is streamed directly from the co-ordinate arrays of the traversal, so no additional libraries are required.
 
 import os
-import geopandas as gpd
-from shapely.geometry import Point
-from geofurlong import Geofurlong
+from geofurlong import Geofurlong, GeoJSON_Writer
 
 
 gf = Geofurlong()
@@ -49,17 +47,10 @@ for group in groups:
         if os.path.exists(geojson_fn):
             continue
 
-        data = []
+        os.makedirs(os.path.dirname(geojson_fn), exist_ok=True)
+        with GeoJSON_Writer(geojson_fn) as writer:
+            for elr in elrs:
+                metric = gf.elr(elr).metric
 
-        for elr in elrs:
-            metric = gf.elr(elr).metric
-
-            for total_yards in gf.traverse(elr, interval):
-                location = gf.at(elr, total_yards, lon_lat=True)
-                mileage = gf.format_linear(total_yards, metric)
-                data.append(
-                    {"geometry": Point(location.x, location.y), "elr": elr, "mileage": mileage, "elr_mileage": f"{elr} {mileage}"}
-                )
-
-        gdf = gpd.GeoDataFrame(data, crs="EPSG:4326")
-        gdf.to_file(geojson_fn, driver="GeoJSON")
+                for points in gf.traverse_points(elr, interval):
+                    writer.write_points(points, metric)
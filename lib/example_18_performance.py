@@ -28,6 +28,45 @@ if __name__ == "__main__":
                         f"{run}    {elr:4}   {elr_len_km:7.3f}            {interval:4}  {'True ' if lon_lat else 'False'}              {iterations_per_second:7.0f}"
                     )
 
+    print("\nVectorised (at_many)")
+    print("Run  ELR   Len (km)    Interval (y)  Lon_Lat  Iterations/second")
+
+    for elr in elrs:
+        elr_len_km = gf.elr(elr).measured_len_km
+        for interval in intervals:
+            total_yards = gf.traverse_array(elr, interval)
+            for lon_lat in (False, True):
+                for run in range(1, 3):
+                    start_time = time.time()
+                    _ = gf.at_many(elr, total_yards, lon_lat=lon_lat)
+                    end_time = time.time()
+                    duration = end_time - start_time
+                    iterations_per_second = len(total_yards) / duration
+
+                    print(
+                        f"{run}    {elr:4}   {elr_len_km:7.3f}            {interval:4}  {'True ' if lon_lat else 'False'}              {iterations_per_second:7.0f}"
+                    )
+
+    # Per-point overhead of the scalar `at` method over the vectorised `at_many` method, on already cached ELRs.
+    print("\nPer-point overhead (microseconds)")
+    print("ELR   Points  at()    at_many()  Overhead")
+
+    for elr in elrs:
+        total_yards = gf.traverse_array(elr, 22)
+        scalar_yards = total_yards.tolist()
+        gf.at(elr, scalar_yards[0])
+
+        start_time = time.perf_counter()
+        for ty in scalar_yards:
+            _ = gf.at(elr, ty)
+        at_us = (time.perf_counter() - start_time) / len(scalar_yards) * 1e6
+
+        start_time = time.perf_counter()
+        _ = gf.at_many(elr, total_yards)
+        at_many_us = (time.perf_counter() - start_time) / len(total_yards) * 1e6
+
+        print(f"{elr:4}  {len(total_yards):6}  {at_us:6.2f}  {at_many_us:9.3f}  {at_us - at_many_us:8.2f}")
+
 """
 Run  ELR   Len (km)    Interval (y)  Lon_Lat  Iterations/second
 1    AIW      0.136              22  False                34224
@@ -0,0 +1,24 @@
+# Compiles the database into a snapshot, then compares the startup time of the API from the database and from the snapshot.
+
+from geofurlong import Geofurlong
+import time
+
+
+if __name__ == "__main__":
+    gf = Geofurlong()
+    snapshot_path = f"geofurlong_{gf.db_version}.snapshot"
+
+    start_time = time.perf_counter()
+    gf.write_snapshot(snapshot_path)
+    print(f"Snapshot written to {snapshot_path} in {time.perf_counter() - start_time:.3f} seconds")
+
+    for label, constructor in (("Database", lambda: Geofurlong()), ("Snapshot", lambda: Geofurlong.from_snapshot(snapshot_path))):
+        start_time = time.perf_counter()
+        gf = constructor()
+        startup_ms = (time.perf_counter() - start_time) * 1_000
+
+        start_time = time.perf_counter()
+        gf.preload()
+        preload_ms = (time.perf_counter() - start_time) * 1_000
+
+        print(f"{label}  startup {startup_ms:8.1f} ms  preload {preload_ms:8.1f} ms  database version {gf.db_version}")
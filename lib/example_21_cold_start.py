@@ -0,0 +1,59 @@
+# Cold-start timing harness, measuring each stage of startup in a fresh Python process per sample:
+# importing the module, constructing the API, the first ELR lookup, and the first planar and geographic points.
+
+import json
+import statistics
+import subprocess
+import sys
+
+
+# ELR and mileage (as total yards) of the points looked up.
+ELR = "MLN1"
+TOTAL_YARDS = 100 * 1_760
+
+# Number of fresh processes to sample.
+SAMPLES = 10
+
+SAMPLE_SCRIPT = f"""
+import json, time
+timings = {{}}
+start = time.perf_counter()
+
+from geofurlong import Geofurlong
+timings["import"] = time.perf_counter()
+
+formatted = Geofurlong.format_linear({TOTAL_YARDS}, False)
+timings["static helper"] = time.perf_counter()
+
+gf = Geofurlong()
+timings["construct"] = time.perf_counter()
+
+gf.elr("{ELR}")
+timings["first elr"] = time.perf_counter()
+
+gf.at("{ELR}", {TOTAL_YARDS})
+timings["first at (planar)"] = time.perf_counter()
+
+gf.at("{ELR}", {TOTAL_YARDS}, lon_lat=True)
+timings["first at (lon_lat)"] = time.perf_counter()
+
+previous = start
+for stage, end in timings.items():
+    timings[stage], previous = (end - previous) * 1_000, end
+print(json.dumps(timings))
+"""
+
+
+if __name__ == "__main__":
+    samples = []
+    for _ in range(SAMPLES):
+        result = subprocess.run([sys.executable, "-c", SAMPLE_SCRIPT], capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout))
+
+    print(f"Stage                 Median (ms)  Max (ms)   ({SAMPLES} fresh processes)")
+    for stage in samples[0]:
+        timings = [sample[stage] for sample in samples]
+        print(f"{stage:20}  {statistics.median(timings):11.1f}  {max(timings):8.1f}")
+
+    totals = [sum(sample.values()) for sample in samples]
+    print(f"{'total':20}  {statistics.median(totals):11.1f}  {max(totals):8.1f}")
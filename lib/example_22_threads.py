@@ -0,0 +1,46 @@
+# Measures the throughput of a single thread-safe API instance shared by an increasing number of threads.
+
+from geofurlong import ThreadSafeGeofurlong
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import time
+
+THREAD_COUNTS = (1, 2, 4, 8)
+POINTS = 50_000
+BATCH_SIZE = 5_000
+
+
+def at_points(gf, work):
+    for elr, ty in work:
+        try:
+            gf.at(elr, ty)
+        except ValueError:
+            pass
+
+
+def locate_batches(gf, elrs, total_yards):
+    for i in range(0, len(elrs), BATCH_SIZE):
+        gf.locate_batch(elrs[i : i + BATCH_SIZE], total_yards[i : i + BATCH_SIZE])
+
+
+if __name__ == "__main__":
+    gf = ThreadSafeGeofurlong()
+    gf.preload()
+
+    rng = np.random.default_rng(0)
+    elrs = rng.choice(gf.elr_codes, POINTS)
+    total_yards = np.array([rng.integers(gf.elr(elr).ty_from, gf.elr(elr).ty_to + 1) for elr in elrs])
+    work = list(zip(elrs.tolist(), total_yards.tolist()))
+
+    print(f"{'threads':>7}  {'at() points/s':>14}  {'locate_batch points/s':>22}")
+    for thread_count in THREAD_COUNTS:
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            start_time = time.perf_counter()
+            list(executor.map(lambda i: at_points(gf, work[i::thread_count]), range(thread_count)))
+            at_rate = POINTS / (time.perf_counter() - start_time)
+
+            start_time = time.perf_counter()
+            list(executor.map(lambda i: locate_batches(gf, elrs[i::thread_count], total_yards[i::thread_count]), range(thread_count)))
+            batch_rate = POINTS / (time.perf_counter() - start_time)
+
+        print(f"{thread_count:7d}  {at_rate:14,.0f}  {batch_rate:22,.0f}")
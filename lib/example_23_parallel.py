@@ -0,0 +1,30 @@
+# Measures the throughput of locating many random mileage points across the whole network with an increasing number of worker processes.
+
+from geofurlong import Geofurlong
+import numpy as np
+import os
+import time
+
+POINTS = 2_000_000
+
+
+if __name__ == "__main__":
+    gf = Geofurlong()
+
+    rng = np.random.default_rng(0)
+    elrs = rng.choice(gf.elr_codes, POINTS)
+    elr_attrs = {elr: gf.elr(elr) for elr in gf.elr_codes}
+    total_yards = np.array([rng.integers(elr_attrs[elr].ty_from, elr_attrs[elr].ty_to + 1) for elr in elrs])
+
+    start_time = time.perf_counter()
+    expected_coords, expected_status = gf.locate_batch(elrs, total_yards, lon_lat=True)
+    print(f"{'locate_batch':>14}  {POINTS / (time.perf_counter() - start_time):12,.0f} points/s")
+
+    process_counts = [n for n in (1, 2, 4, 8, 16, 32) if n < os.cpu_count()] + [os.cpu_count()]
+    for processes in process_counts:
+        start_time = time.perf_counter()
+        coords, status = gf.parallel_locate(elrs, total_yards, lon_lat=True, processes=processes)
+        elapsed = time.perf_counter() - start_time
+
+        assert np.array_equal(status, expected_status) and np.array_equal(coords, expected_coords, equal_nan=True)
+        print(f"{processes:4d} processes  {POINTS / elapsed:12,.0f} points/s")
@@ -0,0 +1,47 @@
+# Measures the latency of bursts of concurrent asyncio `at` requests, with and without coalescing them into batches.
+
+from geofurlong import AsyncGeofurlong, ThreadSafeGeofurlong
+import asyncio
+import numpy as np
+import time
+
+BURSTS = 20
+BURST_SIZE = 2_000
+
+
+async def timed_at(gf, elr, ty, latencies):
+    start_time = time.perf_counter()
+    try:
+        await gf.at(elr, ty)
+    except ValueError:
+        pass
+    latencies.append(time.perf_counter() - start_time)
+
+
+async def run(gf, work):
+    latencies = []
+    start_time = time.perf_counter()
+    for burst in range(BURSTS):
+        await asyncio.gather(*[timed_at(gf, elr, ty, latencies) for elr, ty in work[burst * BURST_SIZE : (burst + 1) * BURST_SIZE]])
+        await asyncio.sleep(0.01)  # Quiet period between bursts.
+
+    return len(latencies) / (time.perf_counter() - start_time), np.percentile(latencies, [50, 99]) * 1_000
+
+
+async def main():
+    sync_gf = ThreadSafeGeofurlong()
+    sync_gf.preload()
+
+    rng = np.random.default_rng(0)
+    elrs = rng.choice(sync_gf.elr_codes, BURSTS * BURST_SIZE)
+    work = [(elr, int(rng.integers(sync_gf.elr(elr).ty_from, sync_gf.elr(elr).ty_to + 1))) for elr in elrs]
+
+    print(f"{'':>14}  {'requests/s':>10}  {'p50 ms':>7}  {'p99 ms':>7}")
+    for label, max_batch_size in (("Single", 1), ("Coalesced", 10_000)):
+        async with AsyncGeofurlong(sync_gf, max_batch_size=max_batch_size) as gf:
+            rate, (p50, p99) = await run(gf, work)
+        print(f"{label:>14}  {rate:10,.0f}  {p50:7.1f}  {p99:7.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
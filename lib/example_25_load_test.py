@@ -0,0 +1,57 @@
+# Load generator for the HTTP geocoding server (started with `python -m geofurlong serve`), reporting throughput and latency percentiles.
+# Each client thread sends `/at` requests over its own keep-alive connection.
+
+from geofurlong import Geofurlong
+import http.client
+import json
+import sys
+import threading
+import time
+import numpy as np
+
+HOST, PORT = "127.0.0.1", 8080
+CLIENTS = (1, 4, 16, 64)
+REQUESTS_PER_CLIENT = 500
+
+
+def client(work, latencies):
+    connection = http.client.HTTPConnection(HOST, PORT)
+    for elr, ty in work:
+        start_time = time.perf_counter()
+        connection.request("GET", f"/at?elr={elr}&ty={ty}")
+        response = connection.getresponse()
+        json.loads(response.read())
+        latencies.append(time.perf_counter() - start_time)
+    connection.close()
+
+
+if __name__ == "__main__":
+    try:
+        connection = http.client.HTTPConnection(HOST, PORT)
+        connection.request("GET", "/health")
+        print(f"Server health: {json.loads(connection.getresponse().read())}")
+    except ConnectionError:
+        sys.exit(f"No server at http://{HOST}:{PORT} - start one with `python -m geofurlong serve`")
+
+    gf = Geofurlong()
+    rng = np.random.default_rng(0)
+    elrs = rng.choice(gf.elr_codes, max(CLIENTS) * REQUESTS_PER_CLIENT)
+    work = [(elr, int(rng.integers(gf.elr(elr).ty_from, gf.elr(elr).ty_to + 1))) for elr in elrs]
+
+    print(f"{'clients':>7}  {'requests/s':>10}  {'p50 ms':>7}  {'p90 ms':>7}  {'p99 ms':>7}")
+    for client_count in CLIENTS:
+        latencies = []
+        threads = [
+            threading.Thread(target=client, args=(work[i * REQUESTS_PER_CLIENT : (i + 1) * REQUESTS_PER_CLIENT], latencies))
+            for i in range(client_count)
+        ]
+
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rate = len(latencies) / (time.perf_counter() - start_time)
+
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1_000
+        print(f"{client_count:7d}  {rate:10,.0f}  {p50:7.2f}  {p90:7.2f}  {p99:7.2f}")
@@ -3,15 +3,53 @@
 # https://www.github.com/geofurlong
 
 
-from typing import List, Tuple, Optional, Iterator
+from typing import List, Tuple, Optional, Iterator, Callable
 from dataclasses import dataclass
 import sqlite3
 import re
+import csv
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
 import numpy as np
+import shapely
 import shapely.wkb
-from shapely.ops import substring, transform
 from shapely import offset_curve
-from pyproj import CRS, Transformer
+
+# NOTE pyproj and shapely.ops are imported when first needed, as pyproj in particular is slow to import.
+# Likewise the multiprocessing modules, which are only used by the `parallel_` methods, and asyncio, only used by `AsyncGeofurlong`
+# and the command line interface. The pyarrow library is optional, only being required by the Arrow and GeoParquet output.
+
+
+class _Lazy_Geometry:
+    """
+    Dataclass field holding a geometry as WKB until it is first read, when it is decoded (once) by Shapely.
+    The field may instead hold the (cached) ELR attributes it was copied from, so that the geometry is decoded once, by the source attributes.
+    """
+
+    def __set_name__(self, owner, name):
+        self._name = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # Default value of the field.
+            return None
+
+        value = getattr(obj, self._name)
+        if isinstance(value, bytes):
+            value = shapely.wkb.loads(value)
+            setattr(obj, self._name, value)
+        elif isinstance(value, ELR_Attributes):
+            value = value.geometry
+            setattr(obj, self._name, value)
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self._name, value)
 
 
 @dataclass
@@ -60,12 +98,754 @@ class ELR_Attributes:
     # TRACKmap(s) ELR is located within (AKA Quail Maps).
     trackmaps: List[Tuple[str, str]] = None
 
-    # Virtual centre-line geometry of ELR.
-    geometry: shapely.geometry.LineString = None
+    # Virtual centre-line geometry of ELR (may be given as WKB, which is decoded when first read).
+    geometry: shapely.geometry.LineString = _Lazy_Geometry()
 
-    # Linear calibration data for ELR.
+    # Linear calibration data for ELR, or None if not yet loaded.
     calibration: np.ndarray = None
 
+    # Linear calibration data held as tuples for the scalar `at` path, built along with the calibration.
+    line: "_ELR_Line" = None
+
+    # Vertices of the centre-line geometry, as an (N, 2) array.
+    vertices: np.ndarray = None
+
+    # Cumulative distance (metres) along the centre-line geometry of each vertex.
+    cumulative: np.ndarray = None
+
+
+@dataclass
+class ELR_Points:
+    """Represents a chunk of mileage points on an ELR, with their planar and geographic co-ordinates held as column arrays."""
+
+    # ELR code.
+    elr: str = None
+
+    # Mileage points (as total yards).
+    total_yards: np.ndarray = None
+
+    # Ordnance Survey Easting of each point (metres).
+    easting: np.ndarray = None
+
+    # Ordnance Survey Northing of each point (metres).
+    northing: np.ndarray = None
+
+    # Longitude of each point (decimal degrees).
+    longitude: np.ndarray = None
+
+    # Latitude of each point (decimal degrees).
+    latitude: np.ndarray = None
+
+
+@dataclass
+class ELR_Location:
+    """Represents a candidate ELR and mileage for a co-ordinate, as found by reverse geocoding."""
+
+    # ELR code.
+    elr: str = None
+
+    # Mileage of the nearest point on the ELR centre-line (as total yards), or None if not calibrated.
+    total_yards: int = None
+
+    # Perpendicular distance from the co-ordinate to the ELR centre-line (metres).
+    distance: float = None
+
+
+@dataclass
+class ELR_Locations:
+    """Represents the nearest ELR and mileage of each of a number of co-ordinates, held as column arrays."""
+
+    # ELR code of the nearest ELR, or an empty string if no ELR is within the maximum distance.
+    elr: np.ndarray = None
+
+    # Mileage of the nearest point on the ELR centre-line (as total yards), or NaN if not located or not calibrated.
+    total_yards: np.ndarray = None
+
+    # Perpendicular distance from the co-ordinate to the ELR centre-line (metres), or NaN if not located.
+    distance: np.ndarray = None
+
+
+@dataclass
+class ELR_Range:
+    """Represents a mileage range of an ELR, such as the portion of the ELR within an area."""
+
+    # ELR code.
+    elr: str = None
+
+    # Low mileage limit of the range (as total yards), or None if not calibrated.
+    ty_from: int = None
+
+    # High mileage limit of the range (as total yards), or None if not calibrated.
+    ty_to: int = None
+
+
+@dataclass
+class ELR_Cache_Stats:
+    """Represents the usage statistics of the ELR cache."""
+
+    # Number of ELR lookups served from the cache.
+    hits: int = 0
+
+    # Number of ELR lookups requiring a database load.
+    misses: int = 0
+
+    # Number of ELRs evicted from the cache to stay within its limits.
+    evictions: int = 0
+
+    # Number of ELRs currently cached.
+    entries: int = 0
+
+    # Estimated memory (bytes) of the geometry and arrays of the currently cached ELRs.
+    memory_bytes: int = 0
+
+
+class _ELR_Cache:
+    """Least-recently-used cache of ELR attributes, optionally bounded by number of entries and/or estimated bytes."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        if max_entries is not None and max_entries <= 0:
+            raise ValueError("max_entries must be a positive integer above zero")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer above zero")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = ELR_Cache_Stats()
+
+        # ELR code -> (attributes, estimated bytes), ordered from least to most recently used.
+        self._entries = OrderedDict()
+
+    def get(self, elr: str) -> Optional[ELR_Attributes]:
+        """Returns the cached attributes of the ELR (marking it as most recently used), or None if not cached."""
+
+        entry = self._entries.get(elr)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self._entries.move_to_end(elr)
+        return entry[0]
+
+    def __contains__(self, elr: str) -> bool:
+        return elr in self._entries
+
+    def __getitem__(self, elr: str) -> ELR_Attributes:
+        return self._entries[elr][0]
+
+    def __setitem__(self, elr: str, attrs: ELR_Attributes):
+        if elr in self._entries:
+            self.stats.memory_bytes -= self._entries.pop(elr)[1]
+
+        size = _ELR_Cache.estimate_bytes(attrs)
+        self._entries[elr] = (attrs, size)
+        self.stats.memory_bytes += size
+
+        # Evict the least recently used ELRs, always retaining the ELR just added.
+        while len(self._entries) > 1 and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.stats.memory_bytes > self.max_bytes)
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.stats.memory_bytes -= evicted_size
+            self.stats.evictions += 1
+
+        self.stats.entries = len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def estimate_bytes(attrs: ELR_Attributes) -> int:
+        """Returns the estimated memory (bytes) of the geometry (as its WKB size) and arrays of the ELR attributes."""
+
+        # The geometry is sized without decoding it, if still held as WKB.
+        size = 0
+        geometry = attrs._geometry
+        if isinstance(geometry, bytes):
+            size += len(geometry)
+        elif geometry is not None:
+            size += 9 + 16 * shapely.get_num_coordinates(geometry)
+        for array in (attrs.calibration, attrs.vertices, attrs.cumulative):
+            if array is not None:
+                size += array.nbytes
+        if attrs.line is not None:
+            # Four tuples of Python numbers, of about 32 bytes per value.
+            size += 4 * 32 * len(attrs.line.ty_from)
+
+        return int(size)
+
+
+class _Locked_ELR_Cache(_ELR_Cache):
+    """ELR cache which may be shared by threads, with each operation guarded by a lock."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        super().__init__(max_entries, max_bytes)
+        self._lock = threading.Lock()
+
+    def get(self, elr: str) -> Optional[ELR_Attributes]:
+        with self._lock:
+            return super().get(elr)
+
+    def __contains__(self, elr: str) -> bool:
+        with self._lock:
+            return super().__contains__(elr)
+
+    def __getitem__(self, elr: str) -> ELR_Attributes:
+        with self._lock:
+            return super().__getitem__(elr)
+
+    def __setitem__(self, elr: str, attrs: ELR_Attributes):
+        with self._lock:
+            super().__setitem__(elr, attrs)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return super().__len__()
+
+
+@dataclass(frozen=True, slots=True)
+class _ELR_Line:
+    """Immutable calibration of an ELR held as tuples, so that the scalar `at` path searches it without NumPy scalar overheads."""
+
+    # Calibration columns.
+    ty_from: Tuple[int, ...]
+    ty_to: Tuple[int, ...]
+    lo_from: Tuple[float, ...]
+    lo_to: Tuple[float, ...]
+
+    @staticmethod
+    def build(calibration: np.ndarray) -> "_ELR_Line":
+        """Builds the line from the calibration array of an ELR."""
+
+        return _ELR_Line(*(tuple(calibration[name].tolist()) for name in ("ty_from", "ty_to", "lo_from", "lo_to")))
+
+    def linear_offset(self, ty: int) -> Optional[float]:
+        """Returns the linear offset of a mileage point (expressed as total yards), or None if not calibrated."""
+
+        # Binary search for the calibration segment containing the total yards.
+        idx = bisect_right(self.ty_from, ty) - 1
+        if idx < 0 or ty > self.ty_to[idx]:
+            return None
+
+        ty_from, ty_to = self.ty_from[idx], self.ty_to[idx]
+        lo_from, lo_to = self.lo_from[idx], self.lo_to[idx]
+        if ty_to == ty_from:
+            return lo_from
+
+        return lo_from + ((ty - ty_from) / (ty_to - ty_from) * (lo_to - lo_from))
+
+
+class _Calibration_Store:
+    """
+    Calibration of all ELRs, held as contiguous columns in a compressed sparse row (CSR) layout.
+    The calibration rows of the ELR with index i (in ELR code order) are rows offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, elr_codes, elr_ty_from, elr_ty_to, offsets, ty_from, ty_to, lo_from, lo_to):
+        # ELR codes, sorted, in the order of the ELR indices.
+        self.elr_codes = elr_codes
+
+        # Reported low and high mileage limits of each ELR (as total yards).
+        self.elr_ty_from = elr_ty_from
+        self.elr_ty_to = elr_ty_to
+
+        # First calibration row of each ELR, followed by the total number of rows.
+        self.offsets = offsets
+
+        # Calibration columns, ordered by ELR index then total yards.
+        self.ty_from = ty_from
+        self.ty_to = ty_to
+        self.lo_from = lo_from
+        self.lo_to = lo_to
+
+        # Search keys placing the rows of each ELR within a band of its own, so that a single binary search
+        # finds the calibration rows of any number of (ELR, total yards) or (ELR, linear offset) pairs.
+        row_elr = np.repeat(np.arange(len(elr_codes)), np.diff(offsets))
+        self._ty_band = _Calibration_Store._band(ty_from, ty_to)
+        self._lo_band = _Calibration_Store._band(lo_from, lo_to)
+        self._ty_keys = _Calibration_Store._keys(self._ty_band, row_elr, ty_from)
+
+        # Linear offset keys are of the lower end of each row, sorted, as linear offsets decrease along some calibration rows.
+        lo_keys = _Calibration_Store._keys(self._lo_band, row_elr, np.minimum(lo_from, lo_to))
+        self._lo_order = np.argsort(lo_keys, kind="stable")
+        self._lo_keys = lo_keys[self._lo_order]
+
+    @staticmethod
+    def build(elr_codes: np.ndarray, elr_ty_from: np.ndarray, elr_ty_to: np.ndarray, calibration_elrs: np.ndarray, calibration: np.ndarray) -> "_Calibration_Store":
+        """
+        Builds the store from the sorted ELR codes and mileage limits of all ELRs, plus an array of calibration rows (of dtype
+        `Geofurlong._CALIBRATION_DTYPE`) and the ELR code of each row. Rows of ELRs which are not known are ignored.
+        """
+
+        elr_codes = np.asarray(elr_codes, dtype="<U4")
+        calibration_elrs = np.asarray(calibration_elrs, dtype="<U4")
+
+        row_elr = np.searchsorted(elr_codes, calibration_elrs)
+        known = row_elr < len(elr_codes)
+        known[known] = elr_codes[row_elr[known]] == calibration_elrs[known]
+
+        order = np.lexsort((calibration["ty_from"][known], row_elr[known]))
+        row_elr, calibration = row_elr[known][order], calibration[known][order]
+        offsets = np.searchsorted(row_elr, np.arange(len(elr_codes) + 1))
+
+        return _Calibration_Store(
+            elr_codes,
+            np.asarray(elr_ty_from, dtype=np.int32),
+            np.asarray(elr_ty_to, dtype=np.int32),
+            offsets,
+            np.ascontiguousarray(calibration["ty_from"], dtype=np.int32),
+            np.ascontiguousarray(calibration["ty_to"], dtype=np.int32),
+            np.ascontiguousarray(calibration["lo_from"], dtype=np.float64),
+            np.ascontiguousarray(calibration["lo_to"], dtype=np.float64),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the memory (bytes) of the store's arrays."""
+
+        arrays = (self.elr_codes, self.elr_ty_from, self.elr_ty_to, self.offsets, self.ty_from, self.ty_to, self.lo_from, self.lo_to)
+        return sum(array.nbytes for array in arrays) + self._ty_keys.nbytes + self._lo_keys.nbytes + self._lo_order.nbytes
+
+    def elr_index(self, elrs: np.ndarray) -> np.ndarray:
+        """Returns the ELR index of each of an array of ELR codes, or -1 for codes which are not known."""
+
+        elrs = np.asarray(elrs, dtype=str)
+        if len(self.elr_codes) == 0:
+            return np.full(elrs.shape, -1)
+
+        idx = np.minimum(np.searchsorted(self.elr_codes, elrs), len(self.elr_codes) - 1)
+        return np.where(self.elr_codes[idx] == elrs, idx, -1)
+
+    def calibrated(self, elr_index: np.ndarray) -> np.ndarray:
+        """Returns whether each of an array of ELR indices is known and has calibration data."""
+
+        safe_index = np.maximum(elr_index, 0)
+        return (elr_index >= 0) & (self.offsets[safe_index + 1] > self.offsets[safe_index])
+
+    def calibration(self, elr_index: int) -> np.ndarray:
+        """Returns the calibration array of an ELR, as loaded by `Geofurlong` for a single ELR."""
+
+        start, end = self.offsets[elr_index], self.offsets[elr_index + 1]
+        calibration = np.empty(end - start, dtype=Geofurlong._CALIBRATION_DTYPE)
+        for name in ("ty_from", "ty_to", "lo_from", "lo_to"):
+            calibration[name] = getattr(self, name)[start:end]
+
+        return calibration
+
+    def linear_offsets(self, elr_index: np.ndarray, total_yards: np.ndarray) -> np.ndarray:
+        """
+        Returns the linear offsets of mileage points (expressed as total yards) on any number of ELRs, given as parallel arrays.
+        Mileage points without calibration data, or of unknown ELRs (index -1), are returned as NaN.
+        """
+
+        total_yards = np.asarray(total_yards, dtype=np.float64)
+        idx, found = self._rows(self._ty_keys, self._ty_band, elr_index, total_yards)
+
+        linear_offset = _Calibration_Store.segment_offsets(self.ty_from[idx], self.ty_to[idx], self.lo_from[idx], self.lo_to[idx], total_yards)
+        linear_offset[~found] = np.nan
+        return linear_offset
+
+    @staticmethod
+    def segment_offsets(ty_from: np.ndarray, ty_to: np.ndarray, lo_from: np.ndarray, lo_to: np.ndarray, total_yards: np.ndarray) -> np.ndarray:
+        """
+        Returns the linear offsets of mileage points (expressed as total yards), each interpolated within its given calibration segment.
+        Mileage points outside their segment are returned as NaN.
+        """
+
+        ty_from = ty_from.astype(np.float64)
+        ty_to = ty_to.astype(np.float64)
+        lo_from = lo_from.astype(np.float64)
+        lo_to = lo_to.astype(np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(ty_to > ty_from, (total_yards - ty_from) / (ty_to - ty_from), 0.0)
+        linear_offset = lo_from + ratio * (lo_to - lo_from)
+
+        linear_offset[(total_yards < ty_from) | (total_yards > ty_to)] = np.nan
+        return linear_offset
+
+    def total_yards_at(self, elr_index: np.ndarray, linear_offset: np.ndarray) -> np.ndarray:
+        """
+        Returns the mileage points (expressed as total yards) of linear offsets on any number of ELRs, given as parallel arrays.
+        This is the inverse of `linear_offsets` (including along rows whose linear offsets decrease), with linear offsets
+        lacking calibration data returned as NaN.
+        """
+
+        linear_offset = np.asarray(linear_offset, dtype=np.float64)
+        idx, found = self._rows(self._lo_keys, self._lo_band, elr_index, linear_offset, self._lo_order)
+
+        ty_from = self.ty_from[idx].astype(np.float64)
+        ty_to = self.ty_to[idx].astype(np.float64)
+        lo_from, lo_to = self.lo_from[idx], self.lo_to[idx]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(lo_to != lo_from, (linear_offset - lo_from) / (lo_to - lo_from), 0.0)
+        total_yards = ty_from + np.clip(ratio, 0.0, 1.0) * (ty_to - ty_from)
+
+        tolerance = Geofurlong.LINEAR_OFFSET_TOLERANCE_M
+        outwith = (linear_offset < np.minimum(lo_from, lo_to) - tolerance) | (linear_offset > np.maximum(lo_from, lo_to) + tolerance)
+        total_yards[~found | outwith] = np.nan
+        return total_yards
+
+    def _rows(
+        self, keys: np.ndarray, band: Tuple[float, float], elr_index: np.ndarray, values: np.ndarray, order: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the last calibration row of each ELR whose key is at or before each value (else the ELR's first row), plus whether
+        the ELR has any rows. Rows of ELRs without calibration data are returned as row 0, for the caller to mask.
+        If the keys are not in row order, `order` gives the row of each key.
+        """
+
+        elr_index = np.asarray(elr_index)
+        found = self.calibrated(elr_index)
+        if not found.any():
+            return np.zeros(len(values), dtype=np.int64), found
+
+        safe_index = np.maximum(elr_index, 0)
+        idx = np.searchsorted(keys, _Calibration_Store._keys(band, safe_index, values), side="right") - 1
+        idx = np.clip(idx, self.offsets[safe_index], self.offsets[safe_index + 1] - 1)
+        if order is not None:
+            idx = order[idx]
+        return np.where(found, idx, 0), found
+
+    @staticmethod
+    def _band(lower: np.ndarray, upper: np.ndarray) -> Tuple[float, float]:
+        """Returns the base and width of a band of search keys spanning all values of a pair of columns."""
+
+        if len(lower) == 0:
+            return 0.0, 1.0
+
+        base = float(min(lower.min(), upper.min()))
+        return base, float(max(lower.max(), upper.max())) - base + 1.0
+
+    @staticmethod
+    def _keys(band: Tuple[float, float], elr_index: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Returns the search keys of values within the bands of their ELRs."""
+
+        base, width = band
+        return elr_index * width + (np.asarray(values, dtype=np.float64) - base)
+
+
+class _ELR_Spatial_Index:
+    """Spatial index of the centre-lines of all ELRs, split into short pieces so that each query projects onto few segments."""
+
+    # Maximum number of segments in each indexed piece of centre-line.
+    PIECE_SEGMENTS = 32
+
+    def __init__(self, elr_codes, vertices, cumulative, piece_elr, piece_start, piece_end, tree):
+        # ELR codes, in the order of the ELR indices below.
+        self.elr_codes = elr_codes
+
+        # Vertices of all centre-lines, concatenated as an (N, 2) array.
+        self.vertices = vertices
+
+        # Cumulative distance (metres) of each vertex along its own ELR centre-line.
+        self.cumulative = cumulative
+
+        # ELR index, first vertex, and last vertex of each piece.
+        self.piece_elr = piece_elr
+        self.piece_start = piece_start
+        self.piece_end = piece_end
+
+        # STRtree of the piece geometries.
+        self.tree = tree
+
+    @staticmethod
+    def build(elr_codes: Tuple[str, ...], geometries: np.ndarray) -> "_ELR_Spatial_Index":
+        """Builds the spatial index from the centre-line geometries of the ELRs."""
+
+        vertices, vertex_elr = shapely.get_coordinates(geometries, return_index=True)
+        vertex_counts = np.bincount(vertex_elr, minlength=len(geometries))
+        first_vertex = np.cumsum(vertex_counts) - vertex_counts
+
+        # Cumulative distance along each centre-line, restarting from zero at the first vertex of each ELR.
+        segment_len = np.hypot(*np.diff(vertices, axis=0).T) * (np.diff(vertex_elr) == 0)
+        cumulative = np.concatenate(([0.0], np.cumsum(segment_len)))
+        cumulative -= cumulative[first_vertex][vertex_elr]
+
+        # Split each centre-line into pieces of up to PIECE_SEGMENTS segments.
+        segment_counts = np.maximum(vertex_counts - 1, 0)
+        piece_counts = -(-segment_counts // _ELR_Spatial_Index.PIECE_SEGMENTS)
+        piece_elr = np.repeat(np.arange(len(geometries)), piece_counts)
+        piece_number = np.arange(len(piece_elr)) - np.repeat(np.cumsum(piece_counts) - piece_counts, piece_counts)
+        piece_start = first_vertex[piece_elr] + piece_number * _ELR_Spatial_Index.PIECE_SEGMENTS
+        piece_end = np.minimum(piece_start + _ELR_Spatial_Index.PIECE_SEGMENTS, first_vertex[piece_elr] + segment_counts[piece_elr])
+
+        piece_vertices = Geofurlong._ragged_indices(piece_start, piece_end - piece_start + 1)
+        piece_geometries = shapely.linestrings(
+            vertices[piece_vertices], indices=np.repeat(np.arange(len(piece_elr)), piece_end - piece_start + 1)
+        )
+
+        return _ELR_Spatial_Index(
+            elr_codes, vertices, cumulative, piece_elr, piece_start, piece_end, shapely.STRtree(piece_geometries)
+        )
+
+
+class _Snapshot:
+    """
+    Compiled binary snapshot of the database, being a directory of NumPy arrays which are memory-mapped when loaded.
+    Variable-length values (geometries, vertices, and calibration) are held in compressed sparse row (CSR) layouts.
+    """
+
+    # Version of the snapshot layout, to be incremented whenever it changes.
+    FORMAT_VERSION = 1
+
+    # File recording the versions and arrays of a snapshot, written last to mark the snapshot as complete.
+    VERSION_FN = "snapshot.json"
+
+    # Text columns of the `elr` table, as selected by `Geofurlong._ELR_COLUMNS`.
+    TEXT_COLUMNS = ("l_system", "route", "section", "remarks", "grouping", "neighbours", "quail_book")
+
+    # Alignment (bytes) of each array within shared memory.
+    SHARED_ALIGNMENT = 64
+
+    def __init__(self, db_version: str, arrays: dict):
+        # Version of the database the snapshot was compiled from.
+        self.db_version = db_version
+
+        # Arrays of the snapshot, by name.
+        self.arrays = arrays
+
+        # ELR codes, sorted, in the order of the ELR indices.
+        self.elr_codes = arrays["elr_codes"]
+
+    @staticmethod
+    def build(db_version: str, elr_rows: List[tuple], store: _Calibration_Store) -> "_Snapshot":
+        """
+        Builds a snapshot in memory, from the rows of the `elr` table (the ELR code followed by the columns of
+        `Geofurlong._ELR_COLUMNS`, ordered by ELR code) and the calibration of all ELRs.
+        """
+
+        geometry_index = 5
+        shape_len_index = 4
+        text_indices = (3, 6, 7, 8, 9, 10, 11)
+
+        wkbs = [bytes(row[geometry_index]) for row in elr_rows]
+        geometries = shapely.from_wkb(np.array(wkbs, dtype=object))
+
+        # Vertices and cumulative distances of LineString geometries, leaving GEOS to handle any other geometry type.
+        lines = [Geofurlong._line_arrays(geometry) if geometry.geom_type == "LineString" else (np.empty((0, 2)), np.empty(0)) for geometry in geometries]
+
+        arrays = {
+            "elr_codes": np.array([row[0] for row in elr_rows], dtype="<U4"),
+            "shape_length_m": np.array([row[shape_len_index] for row in elr_rows], dtype=np.float64),
+            "wkb_offsets": np.concatenate(([0], np.cumsum([len(wkb) for wkb in wkbs]))).astype(np.int64),
+            "wkb": np.frombuffer(b"".join(wkbs), dtype=np.uint8),
+            "vertex_offsets": np.concatenate(([0], np.cumsum([len(cumulative) for _, cumulative in lines]))).astype(np.int64),
+            "vertices": np.concatenate([vertices for vertices, _ in lines]) if lines else np.empty((0, 2)),
+            "cumulative": np.concatenate([cumulative for _, cumulative in lines]) if lines else np.empty(0),
+            "text_nulls": np.array([[row[i] is None for i in text_indices] for row in elr_rows], dtype=bool).reshape(-1, len(text_indices)),
+            "elr_ty_from": store.elr_ty_from,
+            "elr_ty_to": store.elr_ty_to,
+            "calibration_offsets": store.offsets,
+            "ty_from": store.ty_from,
+            "ty_to": store.ty_to,
+            "lo_from": store.lo_from,
+            "lo_to": store.lo_to,
+        }
+        for name, i in zip(_Snapshot.TEXT_COLUMNS, text_indices):
+            arrays[name] = np.array(["" if row[i] is None else row[i] for row in elr_rows], dtype=str)
+
+        if not np.array_equal(arrays["elr_codes"], store.elr_codes):
+            raise ValueError("ELR codes of the calibration do not match the ELR table")
+
+        return _Snapshot(db_version, arrays)
+
+    def write(self, path: str):
+        """Writes the snapshot to a directory."""
+
+        os.makedirs(path, exist_ok=True)
+        version_fn = os.path.join(path, _Snapshot.VERSION_FN)
+        if os.path.exists(version_fn):
+            # Invalidate any previous snapshot until this one is complete.
+            os.remove(version_fn)
+
+        for name, array in self.arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+        versions = {
+            "format_version": _Snapshot.FORMAT_VERSION,
+            "db_version": self.db_version,
+            "api_version": Geofurlong.API_VERSION,
+            "arrays": sorted(self.arrays),
+        }
+        with open(version_fn, "w") as version_file:
+            json.dump(versions, version_file, indent=2)
+
+    @staticmethod
+    def load(path: str) -> "_Snapshot":
+        """Loads a snapshot from a directory, memory-mapping its arrays."""
+
+        version_fn = os.path.join(path, _Snapshot.VERSION_FN)
+        if not os.path.exists(version_fn):
+            raise ValueError(f"Not a complete snapshot: {path}")
+
+        with open(version_fn) as version_file:
+            versions = json.load(version_file)
+
+        if versions["format_version"] != _Snapshot.FORMAT_VERSION:
+            raise ValueError(f"Snapshot format version {versions['format_version']} is not supported: {path}")
+
+        # Plain array views of the memory maps (which they keep open), so that results derived from them are not memory maps too.
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False).view(np.ndarray)
+            for name in versions["arrays"]
+        }
+        return _Snapshot(versions["db_version"], arrays)
+
+    def calibration_store(self) -> _Calibration_Store:
+        """Returns the calibration of all ELRs, as views of the memory-mapped arrays."""
+
+        a = self.arrays
+        return _Calibration_Store(
+            self.elr_codes, a["elr_ty_from"], a["elr_ty_to"], a["calibration_offsets"], a["ty_from"], a["ty_to"], a["lo_from"], a["lo_to"]
+        )
+
+    def elr_index(self, elr: str) -> int:
+        """Returns the index of an ELR code, or -1 if not known."""
+
+        idx = int(np.searchsorted(self.elr_codes, elr))
+        return idx if idx < len(self.elr_codes) and self.elr_codes[idx] == elr else -1
+
+    def elr_row(self, elr_index: int) -> tuple:
+        """Returns the row of the `elr` table of an ELR, with the columns of `Geofurlong._ELR_COLUMNS`."""
+
+        a = self.arrays
+        text = [None if a["text_nulls"][elr_index, i] else str(a[name][elr_index]) for i, name in enumerate(_Snapshot.TEXT_COLUMNS)]
+        l_system, route, section, remarks, grouping, neighbours, quail_book = text
+        wkb = a["wkb"][a["wkb_offsets"][elr_index] : a["wkb_offsets"][elr_index + 1]].tobytes()
+
+        return (
+            int(a["elr_ty_from"][elr_index]),
+            int(a["elr_ty_to"][elr_index]),
+            l_system,
+            float(a["shape_length_m"][elr_index]),
+            wkb,
+            route,
+            section,
+            remarks,
+            grouping,
+            neighbours,
+            quail_book,
+        )
+
+    def line_arrays(self, elr_index: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Returns views of the vertices and cumulative distances of an ELR's centre-line, or None if not a LineString."""
+
+        start, end = self.arrays["vertex_offsets"][elr_index], self.arrays["vertex_offsets"][elr_index + 1]
+        if start == end:
+            return None, None
+        return self.arrays["vertices"][start:end], self.arrays["cumulative"][start:end]
+
+    def geometries(self) -> np.ndarray:
+        """Returns the centre-line geometries of all ELRs."""
+
+        wkb, offsets = self.arrays["wkb"], self.arrays["wkb_offsets"]
+        return shapely.from_wkb(np.array([wkb[start:end].tobytes() for start, end in zip(offsets[:-1], offsets[1:])], dtype=object))
+
+    def share(self) -> Tuple["shared_memory.SharedMemory", List[tuple]]:
+        """
+        Copies the arrays of the snapshot into a single block of shared memory, to be attached by other processes with `attach`.
+        Returns the block (which the caller must close and unlink when finished) and the layout of the arrays within it.
+        """
+
+        from multiprocessing import shared_memory
+
+        # Name, data type, shape, and byte offset of each array, aligned to whole cache lines.
+        layout, size = [], 0
+        for name, array in self.arrays.items():
+            layout.append((name, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // _Snapshot.SHARED_ALIGNMENT) * _Snapshot.SHARED_ALIGNMENT
+
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, dtype, shape, offset in layout:
+            np.ndarray(shape, dtype, buffer=block.buf, offset=offset)[...] = self.arrays[name]
+
+        return block, layout
+
+    @staticmethod
+    def attach(block_name: str, db_version: str, layout: List[tuple]) -> Tuple["_Snapshot", "shared_memory.SharedMemory"]:
+        """Attaches a snapshot shared by another process with `share`, returning the snapshot of views of the block, and the block."""
+
+        from multiprocessing import shared_memory
+
+        block = shared_memory.SharedMemory(name=block_name)
+        arrays = {name: np.ndarray(shape, dtype, buffer=block.buf, offset=offset) for name, dtype, shape, offset in layout}
+        return _Snapshot(db_version, arrays), block
+
+
+class _Parallel_Worker:
+    """
+    Functions run by each worker process of the `parallel_` and `export_network` methods,
+    using an API attached to the snapshot shared by the parent process.
+    """
+
+    # API of the worker process.
+    geofurlong = None
+
+    # Shared memory block of the snapshot, held open for the life of the worker process.
+    block = None
+
+    @staticmethod
+    def init(block_name: str, db_version: str, layout: List[tuple]):
+        """Initialises the worker process, attaching the shared snapshot."""
+
+        snapshot, _Parallel_Worker.block = _Snapshot.attach(block_name, db_version, layout)
+        _Parallel_Worker.geofurlong = Geofurlong._from_snapshot(snapshot)
+
+    @staticmethod
+    def locate(elrs: np.ndarray, total_yards: np.ndarray, lon_lat: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Locates a chunk of mileage points, as per `locate_batch`."""
+
+        return _Parallel_Worker.geofurlong.locate_batch(elrs, total_yards, lon_lat)
+
+    @staticmethod
+    def traverse(elr: str, interval: int) -> ELR_Points:
+        """Locates all points at the specified interval within an ELR, as per `traverse_points`."""
+
+        gf = _Parallel_Worker.geofurlong
+        total_yards = gf.traverse_array(elr, interval)
+        planar = gf._locate_or_raise(elr, total_yards)
+        geographic = gf._to_lon_lat(planar)
+
+        return ELR_Points(
+            elr=elr,
+            total_yards=total_yards,
+            easting=planar[:, 0],
+            northing=planar[:, 1],
+            longitude=geographic[:, 0],
+            latitude=geographic[:, 1],
+        )
+
+    @staticmethod
+    def export(elr: str, interval: int, fn: str, output_format: str) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Exports all points at the specified interval within an ELR to a file, as per `export_network`, returning the number of points or the error.
+        The file is written under a temporary name and then renamed, so it is either complete or absent.
+        """
+
+        gf = _Parallel_Worker.geofurlong
+        partial_fn = f"{fn}.partial"
+
+        try:
+            if output_format == "parquet":
+                with GeoParquet_Writer(partial_fn) as writer:
+                    for batch in gf.traverse_arrow(elr, interval):
+                        writer.write(batch)
+            else:
+                metric = gf.elr(elr).metric
+                with GeoJSON_Writer(partial_fn, ndjson=output_format == "ndjson") as writer:
+                    for points in gf.traverse_points(elr, interval):
+                        writer.write_points(points, metric)
+        except ValueError as e:
+            if os.path.exists(partial_fn):
+                os.remove(partial_fn)
+            return None, str(e)
+
+        os.replace(partial_fn, fn)
+        return writer.count, None
+
 
 class Geofurlong:
     """Geofurlong API for accessing railway geospatial and attribute data."""
@@ -88,49 +868,189 @@ class Geofurlong:
     # Regular expression to validate ELR codes.
     ELR_RegExp = re.compile(r"^[A-Z]{3}\d?$")
 
-    def __init__(self, db_fn: str = "geofurlong.sqlite"):
-        """API constructor."""
+    # Tolerance (metres) when matching linear offsets to calibration, and when merging adjoining pieces of a centre-line.
+    # This absorbs the rounding of offsets measured along the centre-line by GEOS, whilst being well under a yard (the resolution of a mileage).
+    LINEAR_OFFSET_TOLERANCE_M = 0.1
 
-        # Open the SQLite database in read-only mode.
-        self._geo_db = sqlite3.connect(f"file:{db_fn}?mode=ro", uri=True)
+    # Columns of the `elr` table used to build ELR attributes.
+    _ELR_COLUMNS = "total_yards_from, total_yards_to, l_system, shape_length_m, geometry, route, section, remarks, grouping, neighbours, quail_book"
 
-        # ~10 MB SQLite database cache size.
-        self._geo_db.execute("PRAGMA cache_size = -10000")
+    # Data type of the calibration array of an ELR.
+    _CALIBRATION_DTYPE = [
+        ("ty_from", np.int32),
+        ("ty_to", np.int32),
+        ("lo_from", np.float64),
+        ("lo_to", np.float64),
+    ]
 
-        # Transform the co-ordinate system from EPSG:27700 (Planar) to EPSG:4326 (Geographic).
-        self._transformer = Transformer.from_crs(CRS("EPSG:27700"), CRS("EPSG:4326"), always_xy=True)
+    # Per-row status codes returned by the batch methods.
+    STATUS_OK = 0
+    STATUS_INVALID_ELR = 1
+    STATUS_UNKNOWN_ELR = 2
+    STATUS_OUTWITH_BOUNDS = 3
+    STATUS_NO_CALIBRATION = 4
+    STATUS_INVALID_MILEAGE = 5
 
-        # Load all the ELR codes from the database.
-        self._load_all_elr_codes()
+    # Columns of the Arrow record batches, with the geometry being WKB Points of the Geographic co-ordinates.
+    ARROW_COLUMNS = ("elr", "total_yards", "mileage", "x", "y", "lon", "lat", "geometry")
 
-        # Set up dictionary to act as cache for ELR attributes.
-        self._elr_cache = {}
+    # Output formats of `export_network`, also being the extensions of the files written.
+    EXPORT_FORMATS = ("geojson", "ndjson", "parquet")
 
-        # The attributes of the currently loaded ELR.
-        self._elr_attrs = ELR_Attributes()
+    # Manifest file of `export_network`, and the interval (seconds) between rewrites of the manifest during an export.
+    EXPORT_MANIFEST_FN = "manifest.json"
+    EXPORT_MANIFEST_INTERVAL_S = 1.0
 
-    @property
-    @staticmethod
-    def api_version(self) -> str:
-        """Return the version of the Python API."""
+    def __init__(self, db_fn: str = "geofurlong.sqlite", cache_max_entries: Optional[int] = None, cache_max_bytes: Optional[int] = None):
+        """
+        API constructor.
+        The ELR cache is unbounded by default, or may be bounded by number of ELRs and/or estimated bytes, evicting the least recently used.
+        """
 
-        return Geofurlong.API_VERSION
+        self._geo_db = Geofurlong._connect(db_fn)
 
-    @property
-    def db_version(self) -> str:
-        """Return the version of the SQLite database."""
+        # Compiled snapshot of the database, used in place of the SQLite database if constructed by `from_snapshot`.
+        self._snapshot = None
 
-        cursor = self._geo_db.cursor()
-        cursor.execute("SELECT value FROM version WHERE property='version'")
-        return cursor.fetchone()[0]
+        self._setup(cache_max_entries, cache_max_bytes)
 
-    def _load_all_elr_codes(self):
-        """Loads all ELR codes from the database."""
+    @classmethod
+    def from_snapshot(cls, path: str, cache_max_entries: Optional[int] = None, cache_max_bytes: Optional[int] = None) -> "Geofurlong":
+        """
+        API constructor from a snapshot written by `write_snapshot`, in place of the SQLite database.
+        The snapshot is memory-mapped, so startup is fast and its pages are shared by all processes using the same snapshot.
+        """
+
+        return cls._from_snapshot(_Snapshot.load(path), cache_max_entries, cache_max_bytes)
+
+    @classmethod
+    def _from_snapshot(cls, snapshot: _Snapshot, cache_max_entries: Optional[int] = None, cache_max_bytes: Optional[int] = None) -> "Geofurlong":
+        """API constructor from a loaded snapshot, whether memory-mapped from a directory or attached from shared memory."""
+
+        gf = cls.__new__(cls)
+        gf._snapshot = snapshot
+        gf._setup(cache_max_entries, cache_max_bytes)
+        gf._geo_db = None
+
+        # The calibration of all ELRs is read directly from the snapshot.
+        gf._calibration_store = gf._snapshot.calibration_store()
+        return gf
+
+    @staticmethod
+    def _connect(db_fn: str) -> sqlite3.Connection:
+        """Opens a read-only connection to the SQLite database."""
+
+        # Open the SQLite database in read-only mode.
+        geo_db = sqlite3.connect(f"file:{db_fn}?mode=ro", uri=True)
+
+        # ~10 MB SQLite database cache size.
+        geo_db.execute("PRAGMA cache_size = -10000")
+
+        return geo_db
+
+    def _setup(self, cache_max_entries: Optional[int], cache_max_bytes: Optional[int]):
+        """Sets up the state common to both API constructors."""
+
+        # Load all the ELR codes from the database.
+        self._load_all_elr_codes()
+
+        # Set up least-recently-used cache for ELR attributes.
+        self._elr_cache = _ELR_Cache(cache_max_entries, cache_max_bytes)
+
+        # The attributes of the currently loaded ELR.
+        self._elr_attrs = ELR_Attributes()
+
+        # Calibration of all ELRs as used by the batch methods, built on first use.
+        self._calibration_store = None
+
+        # Transformers from Planar to Geographic and vice versa, and spatial index of all ELRs, all built on first use.
+        self._lon_lat_transformer = None
+        self._planar_transformer = None
+        self._spatial_index = None
+
+        # Snapshot of all ELRs published to worker processes, compiled from the database on first use.
+        self._compiled_snapshot = None
+
+    @property
+    @staticmethod
+    def api_version(self) -> str:
+        """Return the version of the Python API."""
+
+        return Geofurlong.API_VERSION
+
+    @property
+    def db_version(self) -> str:
+        """Return the version of the SQLite database."""
+
+        if self._snapshot is not None:
+            return self._snapshot.db_version
+
+        cursor = self._geo_db.cursor()
+        cursor.execute("SELECT value FROM version WHERE property='version'")
+        return cursor.fetchone()[0]
+
+    def _load_all_elr_codes(self):
+        """Loads all ELR codes from the database."""
+
+        if self._snapshot is not None:
+            self.elr_codes = tuple(self._snapshot.elr_codes.tolist())
+            return
 
         cursor = self._geo_db.cursor()
         cursor.execute("SELECT elr FROM elr ORDER BY elr")
         self.elr_codes = tuple(row[0] for row in cursor.fetchall())
 
+    @property
+    def _transformer(self) -> "pyproj.Transformer":
+        """Returns the transformer of the co-ordinate system from EPSG:27700 (Planar) to EPSG:4326 (Geographic), built on first use."""
+
+        if self._lon_lat_transformer is None:
+            self._lon_lat_transformer = Geofurlong._build_transformer("EPSG:27700", "EPSG:4326")
+        return self._lon_lat_transformer
+
+    @staticmethod
+    def _build_transformer(from_crs: str, to_crs: str) -> "pyproj.Transformer":
+        """Builds a co-ordinate transformer, importing pyproj on first use."""
+
+        from pyproj import CRS, Transformer
+
+        return Transformer.from_crs(CRS(from_crs), CRS(to_crs), always_xy=True)
+
+    def _to_lon_lat(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Transforms an (N, 2) array of Planar co-ordinates to Geographic, in a single call to the transformer.
+        The result is column-major, so each of its columns is a contiguous view.
+        """
+
+        lon, lat = self._transformer.transform(coords[:, 0], coords[:, 1])
+        return np.vstack((lon, lat)).T
+
+    def _to_planar(self, coords: np.ndarray) -> np.ndarray:
+        """Transforms an (N, 2) array of Geographic co-ordinates to Planar, in a single call to the transformer."""
+
+        if self._planar_transformer is None:
+            self._planar_transformer = Geofurlong._build_transformer("EPSG:4326", "EPSG:27700")
+
+        easting, northing = self._planar_transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack((easting, northing))
+
+    def _to_planar_geometry(self, geometry: shapely.geometry.base.BaseGeometry) -> shapely.geometry.base.BaseGeometry:
+        """Transforms a geometry from Geographic to Planar, rebuilding it from its transformed co-ordinates array."""
+
+        return shapely.transform(geometry, self._to_planar)
+
+    def _to_lon_lat_geometry(self, geometry: shapely.geometry.base.BaseGeometry) -> shapely.geometry.base.BaseGeometry:
+        """Transforms a geometry from Planar to Geographic, rebuilding it from its transformed co-ordinates array."""
+
+        return shapely.transform(geometry, self._to_lon_lat)
+
+    @property
+    def cache_stats(self) -> ELR_Cache_Stats:
+        """Returns a snapshot of the ELR cache usage statistics."""
+
+        stats = self._elr_cache.stats
+        return ELR_Cache_Stats(stats.hits, stats.misses, stats.evictions, stats.entries, stats.memory_bytes)
+
     @property
     def properties(self) -> ELR_Attributes:
         """Returns the attributes and geometry of the current ELR."""
@@ -152,33 +1072,114 @@ class Geofurlong:
             trackmaps=self._elr_attrs.trackmaps,
             grouping=self._elr_attrs.grouping,
             neighbours=self._elr_attrs.neighbours,
-            geometry=self._elr_attrs.geometry,
-            # NOTE calibration is not included.
+            # Decoded through the cached attributes when first read, if still held as WKB.
+            geometry=self._elr_attrs if isinstance(self._elr_attrs._geometry, bytes) else self._elr_attrs._geometry,
+            # NOTE calibration, line, vertices, and cumulative distances are not included.
         )
 
     def elr(self, elr: str) -> ELR_Attributes:
-        """Load the attributes, centre-line geometry, and calibration of the ELR."""
+        """
+        Load the attributes and centre-line geometry of the ELR.
+        The geometry is decoded when first read, and the calibration is loaded when first needed to locate a mileage.
+        """
 
         if elr == self._elr_attrs.elr:
             # ELR is already loaded.
             return self.properties
 
-        if elr in self._elr_cache:
+        self._elr_attrs = self._load_elr(elr)  # Set "current" ELR.
+        return self.properties
+
+    def _load_elr(self, elr: str) -> ELR_Attributes:
+        """Returns the cached attributes of the ELR, loading from the database if required, without changing the current ELR."""
+
+        attrs = self._elr_cache.get(elr)
+        if attrs is not None:
             # ELR is cached.
-            self._elr_attrs = self._elr_cache[elr]
-            return self.properties
+            return attrs
 
         # Check ELR code is valid.
         if not Geofurlong.valid_elr(elr):
             raise ValueError(f"Invalid ELR code: {elr}")
 
-        # Load ELR from database.
-        sql_elr = "SELECT total_yards_from, total_yards_to, l_system, shape_length_m, geometry, route, section, remarks, grouping, neighbours, quail_book FROM elr WHERE elr=? LIMIT 1"
-        cursor_elr = self._geo_db.execute(sql_elr, (elr,))
-        row_elr = cursor_elr.fetchone()
+        # Load ELR from database (or snapshot).
+        if self._snapshot is not None:
+            elr_index = self._snapshot.elr_index(elr)
+            row_elr = self._snapshot.elr_row(elr_index) if elr_index >= 0 else None
+        else:
+            sql_elr = f"SELECT {Geofurlong._ELR_COLUMNS} FROM elr WHERE elr=? LIMIT 1"
+            cursor_elr = self._geo_db.execute(sql_elr, (elr,))
+            row_elr = cursor_elr.fetchone()
         if not row_elr:
             raise ValueError(f"ELR not known: {elr}")
 
+        attrs = Geofurlong._elr_attributes(elr, row_elr)
+
+        self._elr_cache[elr] = attrs  # Add to cache.
+        return attrs
+
+    def _calibrate(self, attrs: ELR_Attributes) -> ELR_Attributes:
+        """Loads the calibration and linear interpolation arrays of the ELR, if not already loaded, returning the attributes."""
+
+        if attrs.calibration is not None:
+            return attrs
+
+        store = self._calibration_store
+        if store is not None:
+            # Take the calibration from the network-wide store, if already built.
+            elr_index = store.elr_index([attrs.elr])
+            if not store.calibrated(elr_index)[0]:
+                raise ValueError(f"No calibration data for {attrs.elr}")
+            calibration = store.calibration(elr_index[0])
+        else:
+            # Load the ELR calibration data (sorted by mileage / kilometreage) into a numpy array.
+            sql_calibration = (
+                "SELECT total_yards_from, total_yards_to, linear_offset_from_m, linear_offset_to_m "
+                "FROM calibration WHERE elr=? "
+                "ORDER BY total_yards_from"
+            )
+
+            cursor_calibration = self._geo_db.execute(sql_calibration, (attrs.elr,))
+            rows_calibration = cursor_calibration.fetchall()
+
+            if len(rows_calibration) == 0:
+                raise ValueError(f"No calibration data for {attrs.elr}")
+
+            calibration = np.array(rows_calibration, dtype=Geofurlong._CALIBRATION_DTYPE)
+
+        self._prepare_interpolation(attrs)
+        Geofurlong._set_calibration(attrs, calibration)
+
+        if attrs.elr in self._elr_cache:
+            self._elr_cache[attrs.elr] = attrs  # Update the cached size.
+        return attrs
+
+    @staticmethod
+    def _set_calibration(attrs: ELR_Attributes, calibration: np.ndarray):
+        """
+        Sets the calibration of an ELR, along with its linear calibration line for the scalar `at` path.
+        The calibration is set last, so that an ELR is never seen as calibrated before its line (and any interpolation arrays) are ready.
+        """
+
+        attrs.line = _ELR_Line.build(calibration)
+        attrs.calibration = calibration
+
+    def _prepare_interpolation(self, attrs: ELR_Attributes):
+        """Precomputes the vertex arrays used for linear interpolation, leaving GEOS to handle any other geometry type."""
+
+        if self._snapshot is not None:
+            # Views of the snapshot's precomputed arrays, without decoding the geometry.
+            attrs.vertices, attrs.cumulative = self._snapshot.line_arrays(self._snapshot.elr_index(attrs.elr))
+        elif attrs.geometry.geom_type == "LineString":
+            attrs.vertices, attrs.cumulative = Geofurlong._line_arrays(attrs.geometry)
+
+    @staticmethod
+    def _elr_attributes(elr: str, row_elr: tuple) -> ELR_Attributes:
+        """
+        Builds the attributes of an ELR from its row of the `elr` table, as selected by `_ELR_COLUMNS`.
+        The geometry is left as WKB, and the calibration unloaded, until first needed.
+        """
+
         elr_ty_from_index, elr_ty_to_index, elr_metric_index, elr_shape_len_m = 0, 1, 2, 3
         elr_geometry_index = 4
         route_index, section_index, remarks_index = 5, 6, 7
@@ -188,145 +1189,1234 @@ class Geofurlong:
         ty_to = int(row_elr[elr_ty_to_index])
         metric = row_elr[elr_metric_index] == "K"
 
-        fm, fy = Geofurlong.split_total_yards(ty_from)
-        tm, ty = Geofurlong.split_total_yards(ty_to)
+        fm, fy = Geofurlong.split_total_yards(ty_from)
+        tm, ty = Geofurlong.split_total_yards(ty_to)
+
+        if metric:
+            fkm = ty_from / Geofurlong.YARDS_IN_MILE * Geofurlong.KM_IN_MILE
+            tkm = ty_to / Geofurlong.YARDS_IN_MILE * Geofurlong.KM_IN_MILE
+            formatted_range = f"{fkm:.3f}km - {tkm:.3f}km (equivalent to {Geofurlong.mileage_verbose(fm, fy, tm, ty)})"
+        else:
+            formatted_range = Geofurlong.mileage_verbose(fm, fy, tm, ty)
+
+        trackmaps = [(book, Geofurlong.trackmap_coverage(book)) for book in row_elr[trackmaps_index].split(";")]
+
+        return ELR_Attributes(
+            elr=elr,
+            ty_from=ty_from,
+            ty_to=ty_to,
+            metric=metric,
+            formatted_range=formatted_range,
+            measured_len_km=row_elr[elr_shape_len_m] / 1_000,
+            route=row_elr[route_index],
+            section=row_elr[section_index],
+            remarks=row_elr[remarks_index],
+            trackmaps=trackmaps,
+            grouping=row_elr[grouping_index].split(";"),
+            neighbours=row_elr[neighbours_index].split(";"),
+            geometry=row_elr[elr_geometry_index],
+        )
+
+    def preload(self, elrs: Optional[List[str]] = None) -> int:
+        """
+        Loads the attributes, centre-line geometry, and calibration of the given ELRs (or all ELRs) into the cache.
+        Each of the `elr` and `calibration` tables is read in a single pass, rather than two queries per ELR.
+        ELRs without calibration data are skipped. Returns the number of ELRs loaded.
+        """
+
+        where, params = "", ()
+        if elrs is not None:
+            elrs = list(elrs)
+            for elr in elrs:
+                if not Geofurlong.valid_elr(elr):
+                    raise ValueError(f"Invalid ELR code: {elr}")
+            where, params = f"WHERE elr IN ({', '.join('?' * len(elrs))}) ", tuple(elrs)
+
+        store = self._calibrations()
+
+        loaded = 0
+        for row_elr in self._elr_rows(where, params):
+            elr = row_elr[0]
+            elr_index = store.elr_index([elr])
+            if not store.calibrated(elr_index)[0]:
+                continue
+
+            attrs = Geofurlong._elr_attributes(elr, row_elr[1:])
+            self._prepare_interpolation(attrs)
+            Geofurlong._set_calibration(attrs, store.calibration(elr_index[0]))
+            self._elr_cache[elr] = attrs
+            loaded += 1
+
+        return loaded
+
+    def _elr_rows(self, where: str = "", params: tuple = ()) -> Iterator[tuple]:
+        """
+        Generates the rows of the `elr` table (the ELR code followed by the columns of `_ELR_COLUMNS`), ordered by ELR code.
+        The rows may be filtered by an `elr IN (...)` clause, as used by `preload`.
+        """
+
+        if self._snapshot is not None:
+            elrs = set(params) if where else None
+            for elr_index, elr in enumerate(self.elr_codes):
+                if elrs is None or elr in elrs:
+                    yield (elr,) + self._snapshot.elr_row(elr_index)
+            return
+
+        yield from self._geo_db.execute(f"SELECT elr, {Geofurlong._ELR_COLUMNS} FROM elr {where}ORDER BY elr", params)
+
+    def write_snapshot(self, path: str):
+        """
+        Compiles the database into a snapshot directory, for fast startup with `from_snapshot`.
+        The snapshot holds the attributes, centre-line vertices, and calibration of all ELRs, and records the database version.
+        """
+
+        self._compiled().write(path)
+
+    def parallel_locate(
+        self, elrs: np.ndarray, total_yards: np.ndarray, lon_lat: bool = False, processes: Optional[int] = None, chunk_size: int = 100_000
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the co-ordinates and per-row status codes of mileage points on any number of ELRs, as per `locate_batch`,
+        computed in chunks of up to `chunk_size` points by a pool of worker processes (by default, one per CPU).
+        """
+
+        elrs = np.asarray(elrs)
+        total_yards = np.asarray(total_yards)
+
+        if elrs.shape != total_yards.shape or elrs.ndim != 1:
+            raise ValueError("elrs and total_yards must be one-dimensional arrays of equal length")
+
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise TypeError("chunk_size must be a positive integer above zero")
+
+        if len(elrs) == 0:
+            return self.locate_batch(elrs, total_yards, lon_lat)
+
+        starts = range(0, len(elrs), chunk_size)
+        chunks = [(elrs[i : i + chunk_size], total_yards[i : i + chunk_size], lon_lat) for i in starts]
+        results = list(self._parallel_map(_Parallel_Worker.locate, chunks, processes))
+
+        return np.concatenate([coords for coords, _ in results]), np.concatenate([status for _, status in results])
+
+    def parallel_traverse(self, elrs: List[str], interval: int = 1760, processes: Optional[int] = None) -> Iterator[ELR_Points]:
+        """
+        Returns a generator of the points at the specified interval within each of the given ELRs, as per the `traverse` method,
+        computed by a pool of worker processes (by default, one per CPU). One `ELR_Points` is generated per ELR, in input order.
+        All ELRs and their calibration are validated when called, rather than part-way through the results.
+        """
+
+        if not isinstance(interval, int) or interval <= 0:
+            raise TypeError("interval must be a positive integer above zero")
+
+        elrs = list(elrs)
+        for elr in elrs:
+            total_yards = self.traverse_array(elr, interval)
+            attrs = self._calibrate(self._load_elr(elr))
+            _, status = Geofurlong._resolve(attrs, total_yards)
+
+            failed = np.flatnonzero(status != Geofurlong.STATUS_OK)
+            if len(failed) > 0:
+                raise Geofurlong._mileage_error(attrs, total_yards[failed[0]].item(), status[failed[0]])
+
+        return self._parallel_map(_Parallel_Worker.traverse, [(elr, interval) for elr in elrs], processes)
+
+    def export_network(
+        self,
+        output_dir: str,
+        intervals: List[int],
+        output_format: str = "geojson",
+        elrs: Optional[List[str]] = None,
+        processes: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
+        """
+        Exports the points at each of the given intervals within every ELR (or the given ELRs) to a file per ELR and interval,
+        named `<output_dir>/<interval>/<ELR>.<format>`, with the work spread across a pool of worker processes (by default, one per CPU).
+        The format is one of `EXPORT_FORMATS`. Each file is written atomically, and recorded in a `manifest.json` file along with the
+        database version, so an interrupted export resumes where it stopped when run again. ELRs which cannot be traversed
+        (for example, with a gap in their calibration) are recorded as failures, and retried when resumed.
+        The optional `progress` function is called with the number of files completed and to be completed. Returns the manifest.
+        """
+
+        if output_format not in Geofurlong.EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {output_format}, not one of {', '.join(Geofurlong.EXPORT_FORMATS)}")
+
+        intervals = list(intervals)
+        for interval in intervals:
+            if not isinstance(interval, int) or interval <= 0:
+                raise TypeError("interval must be a positive integer above zero")
+
+        elrs = list(elrs) if elrs is not None else list(self.elr_codes)
+        for elr in elrs:
+            self.elr(elr)
+
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_fn = os.path.join(output_dir, Geofurlong.EXPORT_MANIFEST_FN)
+        if os.path.exists(manifest_fn):
+            with open(manifest_fn) as manifest_file:
+                manifest = json.load(manifest_file)
+            if (manifest["db_version"], manifest["format"]) != (self.db_version, output_format):
+                raise ValueError(
+                    f"Export in {output_dir} is of database version {manifest['db_version']} in {manifest['format']} format, "
+                    f"not version {self.db_version} in {output_format} format"
+                )
+        else:
+            manifest = {"db_version": self.db_version, "api_version": Geofurlong.API_VERSION, "format": output_format, "outputs": {}, "failures": {}}
+
+        # Outputs not yet completed, or whose files have since been removed.
+        tasks = []
+        for interval in intervals:
+            interval_dir = os.path.join(output_dir, f"{interval:05d}")
+            os.makedirs(interval_dir, exist_ok=True)
+
+            # Files left part-written by an interrupted export are removed, as they are rewritten from the start.
+            for partial_fn in os.listdir(interval_dir):
+                if partial_fn.endswith(".partial"):
+                    os.remove(os.path.join(interval_dir, partial_fn))
+
+            for elr in elrs:
+                key = f"{interval:05d}/{elr}"
+                fn = os.path.join(output_dir, f"{key}.{output_format}")
+                if key not in manifest["outputs"] or not os.path.exists(fn):
+                    manifest["outputs"].pop(key, None)
+                    tasks.append((key, (elr, interval, fn, output_format)))
+
+        manifest["complete"] = False
+        Geofurlong._write_manifest(manifest_fn, manifest)
+
+        last_written = time.monotonic()
+        try:
+            if tasks:
+                from concurrent.futures import as_completed
+
+                with self._worker_pool(processes) as pool:
+                    # Each file is recorded as soon as it completes, in whichever order, so none are lost if the export is interrupted.
+                    futures = {pool.submit(_Parallel_Worker.export, *args): key for key, args in tasks}
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        key = futures[future]
+                        rows, error = future.result()
+                        if error is None:
+                            manifest["outputs"][key] = {"rows": rows}
+                            manifest["failures"].pop(key, None)
+                        else:
+                            manifest["failures"][key] = error
+
+                        if progress is not None:
+                            progress(done, len(tasks))
+
+                        # The manifest is rewritten periodically, rather than after each file, as it may list many thousands of files.
+                        if time.monotonic() - last_written >= Geofurlong.EXPORT_MANIFEST_INTERVAL_S:
+                            Geofurlong._write_manifest(manifest_fn, manifest)
+                            last_written = time.monotonic()
+
+            manifest["complete"] = True
+        finally:
+            Geofurlong._write_manifest(manifest_fn, manifest)
+
+        return manifest
+
+    @staticmethod
+    def _write_manifest(manifest_fn: str, manifest: dict):
+        """Writes the manifest of an export atomically, replacing any previous manifest."""
+
+        partial_fn = f"{manifest_fn}.partial"
+        with open(partial_fn, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(partial_fn, manifest_fn)
+
+    def _parallel_map(self, function, args: List[tuple], processes: Optional[int]) -> Iterator:
+        """Generates the results, in order, of a `_Parallel_Worker` function called with each tuple of arguments by a pool of worker processes."""
+
+        with self._worker_pool(processes) as pool:
+            yield from pool.map(function, *zip(*args))
+
+    @contextmanager
+    def _worker_pool(self, processes: Optional[int]) -> Iterator["concurrent.futures.ProcessPoolExecutor"]:
+        """
+        Yields a pool of worker processes to run `_Parallel_Worker` functions, cancelling any outstanding work if interrupted.
+        The attributes, centre-line vertices, and calibration of all ELRs are published once to the workers, through shared memory,
+        from the snapshot (if constructed by `from_snapshot`) or compiled from the database.
+        """
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        snapshot = self._snapshot if self._snapshot is not None else self._compiled()
+        block, layout = snapshot.share()
+        try:
+            initargs = (block.name, snapshot.db_version, layout)
+            with ProcessPoolExecutor(processes, initializer=_Parallel_Worker.init, initargs=initargs) as pool:
+                try:
+                    yield pool
+                except BaseException:
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+        finally:
+            block.close()
+            block.unlink()
+
+    def _compiled(self) -> _Snapshot:
+        """Returns the snapshot of all ELRs compiled from the database, building it on first use."""
+
+        if self._compiled_snapshot is None:
+            self._compiled_snapshot = _Snapshot.build(self.db_version, list(self._elr_rows()), self._calibrations())
+        return self._compiled_snapshot
+
+    def _calibrations(self) -> _Calibration_Store:
+        """Returns the calibration of all ELRs, building it on first use from a single pass over each of the `elr` and `calibration` tables."""
+
+        if self._calibration_store is None:
+            cursor_elr = self._geo_db.execute("SELECT elr, total_yards_from, total_yards_to FROM elr ORDER BY elr")
+            elrs = np.fromiter(cursor_elr, dtype=[("elr", "<U4"), ("ty_from", np.int32), ("ty_to", np.int32)])
+
+            sql_calibration = (
+                "SELECT elr, total_yards_from, total_yards_to, linear_offset_from_m, linear_offset_to_m "
+                "FROM calibration "
+                "ORDER BY elr, total_yards_from"
+            )
+            cursor_calibration = self._geo_db.execute(sql_calibration)
+            calibration = np.fromiter(cursor_calibration, dtype=[("elr", "<U4")] + Geofurlong._CALIBRATION_DTYPE)
+
+            self._calibration_store = _Calibration_Store.build(
+                elrs["elr"], elrs["ty_from"], elrs["ty_to"], calibration["elr"], calibration
+            )
+
+        return self._calibration_store
+
+    def _linear_offset(self, ty: int) -> float:
+        """Returns the linear offset of a mileage point (expressed as total yards) of the current ELR."""
+
+        linear_offset = self._elr_attrs.line.linear_offset(ty)
+
+        if linear_offset is None:
+            raise Geofurlong._mileage_error(self._elr_attrs, ty, Geofurlong.STATUS_NO_CALIBRATION)
+
+        return linear_offset
+
+    @staticmethod
+    def _mileage_error(attrs: ELR_Attributes, ty: float, status: int) -> ValueError:
+        """Returns the ValueError raised for a mileage point (expressed as total yards) on an ELR which has the given `STATUS_` code."""
+
+        if not np.isfinite(ty):
+            return ValueError(f"Mileage of {ty} on ELR {attrs.elr} is not a finite number of yards")
+
+        if status == Geofurlong.STATUS_OUTWITH_BOUNDS:
+            ty_mileage = Geofurlong.format_total_yards(int(ty))
+            elr_start = Geofurlong.format_total_yards(attrs.ty_from)
+            elr_end = Geofurlong.format_total_yards(attrs.ty_to)
+            return ValueError(
+                f"Mileage of {ty_mileage} [{ty}] on ELR {attrs.elr} outwith valid bounds: {elr_start} [{attrs.ty_from}] - {elr_end} [{attrs.ty_to}]"
+            )
+
+        m, y = Geofurlong.split_total_yards(int(ty))
+        return ValueError(f"No calibration data for {attrs.elr} segment {Geofurlong.fmt(m, y)}: {attrs.formatted_range}")
+
+    def _validate_elr_mileage(self, elr: str, ty: int) -> None:
+        """Checks that the requested mileage is within the ELR limits."""
+
+        # Check ELR code is valid/available and miles/yards are valid.
+        if elr != self._elr_attrs.elr:
+            self._elr_attrs = self._load_elr(elr)  # Set "current" ELR, without copying its attributes.
+        self._calibrate(self._elr_attrs)
+
+        # Check the requested mileage is within the ELR limits.
+        if (ty < self._elr_attrs.ty_from) or (ty > self._elr_attrs.ty_to):
+            raise Geofurlong._mileage_error(self._elr_attrs, ty, Geofurlong.STATUS_OUTWITH_BOUNDS)
+
+    def at(self, elr: str, ty: int, lon_lat: bool = False) -> Optional[shapely.geometry.Point]:
+        """Returns the point geometry of a mileage point on an ELR."""
+
+        self._validate_elr_mileage(elr, ty)
+        lo = self._linear_offset(ty)
+        x, y = Geofurlong._interpolate_point(self._elr_attrs, lo)
+
+        if lon_lat:
+            # Transform co-ordinates from Planar to Geographic (a scalar call is cheapest for a single point).
+            x, y = self._transformer.transform(x, y)
+
+        # Built from a co-ordinate tuple, which Shapely handles more cheaply than separate arguments.
+        return shapely.points((x, y))
+
+    def at_many(self, elr: str, total_yards: np.ndarray, lon_lat: bool = False) -> np.ndarray:
+        """
+        Returns the co-ordinates of an array of mileage points (expressed as total yards) on an ELR.
+        The result is an (N, 2) array of Easting / Northing, or Longitude / Latitude if `lon_lat` is set.
+        """
+
+        coords = self._locate_or_raise(elr, np.asarray(total_yards))
+
+        if lon_lat:
+            # Transform co-ordinates from Planar to Geographic.
+            coords = self._to_lon_lat(coords)
+
+        return coords
+
+    def _locate_or_raise(self, elr: str, total_yards: np.ndarray) -> np.ndarray:
+        """
+        Returns the planar co-ordinates of an array of mileage points on an ELR.
+        A ValueError is raised for the first mileage which cannot be located, with the message `at` would raise.
+        """
+
+        self.elr(elr)
+        coords, status = self._locate(self._calibrate(self._elr_attrs), total_yards)
+
+        failed = np.flatnonzero(status != Geofurlong.STATUS_OK)
+        if len(failed) > 0:
+            raise Geofurlong._mileage_error(self._elr_attrs, total_yards[failed[0]].item(), status[failed[0]])
+
+        return coords
+
+    def locate_batch(self, elrs: np.ndarray, total_yards: np.ndarray, lon_lat: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the co-ordinates of mileage points (expressed as total yards) on any number of ELRs, given as parallel arrays.
+        The result is an (N, 2) array of co-ordinates in input order, plus an array of per-row `STATUS_` codes.
+        Rows which cannot be located have NaN co-ordinates and a non-zero status, rather than raising an exception.
+        """
+
+        elrs = np.asarray(elrs)
+        total_yards = np.asarray(total_yards)
+
+        if elrs.shape != total_yards.shape or elrs.ndim != 1:
+            raise ValueError("elrs and total_yards must be one-dimensional arrays of equal length")
+
+        coords = np.full((len(elrs), 2), np.nan, order="F")
+        elr_index, lo, status = self._resolve_batch(elrs, total_yards)
+
+        for attrs, rows in self._elr_groups(elr_index, np.flatnonzero(status == Geofurlong.STATUS_OK)):
+            coords[rows] = Geofurlong._interpolate(attrs, lo[rows])
+
+        if lon_lat:
+            # Transform the located co-ordinates from Planar to Geographic.
+            located = status == Geofurlong.STATUS_OK
+            coords[located] = self._to_lon_lat(coords[located])
+
+        return coords, status
+
+    def _resolve_batch(self, elrs: np.ndarray, total_yards: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the ELR indices, linear offsets and per-row status codes of mileage points on any number of ELRs.
+        All rows are resolved together against the calibration of all ELRs, without loading any individual ELR.
+        """
+
+        store = self._calibrations()
+        elr_index = store.elr_index(elrs)
+        status = np.full(len(elrs), Geofurlong.STATUS_OK, dtype=np.int8)
+
+        # ELRs which are not known, distinguishing invalid ELR codes.
+        unknown = elr_index < 0
+        if unknown.any():
+            codes, inverse = np.unique(elrs[unknown], return_inverse=True)
+            valid = np.array([Geofurlong.valid_elr(str(code)) for code in codes], dtype=bool)
+            status[unknown] = np.where(valid[inverse], Geofurlong.STATUS_UNKNOWN_ELR, Geofurlong.STATUS_INVALID_ELR)
+
+        # Known ELRs which have no calibration data at all.
+        uncalibrated = ~unknown & ~store.calibrated(elr_index)
+        status[uncalibrated] = Geofurlong.STATUS_NO_CALIBRATION
+        unknown |= uncalibrated
+        elr_index[unknown] = -1
+
+        safe_index = np.maximum(elr_index, 0)
+        outwith = (total_yards < store.elr_ty_from[safe_index]) | (total_yards > store.elr_ty_to[safe_index])
+        status[~unknown & outwith] = Geofurlong.STATUS_OUTWITH_BOUNDS
+
+        lo = store.linear_offsets(elr_index, total_yards)
+        status[(status == Geofurlong.STATUS_OK) & np.isnan(lo)] = Geofurlong.STATUS_NO_CALIBRATION
+
+        return elr_index, lo, status
+
+    def _elr_groups(self, elr_index: np.ndarray, rows: np.ndarray) -> Iterator[Tuple[ELR_Attributes, np.ndarray]]:
+        """
+        Generates the attributes of each distinct ELR amongst the given rows of an array of ELR indices, with the rows of that ELR.
+        Only the ELRs generated are loaded, for their centre-line geometry.
+        """
+
+        # Group the rows by ELR, so each ELR is looked up once and its rows processed in a single vectorised call.
+        rows = rows[np.argsort(elr_index[rows], kind="stable")]
+        bounds = np.flatnonzero(np.diff(elr_index[rows])) + 1
+
+        for group in np.split(rows, bounds) if len(rows) > 0 else []:
+            elr = str(self._calibration_store.elr_codes[elr_index[group[0]]])
+            yield self._calibrate(self._load_elr(elr)), group
+
+    def _locate(self, attrs: ELR_Attributes, total_yards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the planar co-ordinates and per-row status codes of an array of mileage points on an ELR.
+        Rows which cannot be located have NaN co-ordinates. The co-ordinates are column-major, so each column is a contiguous view.
+        """
+
+        coords = np.full((len(total_yards), 2), np.nan, order="F")
+        lo, status = Geofurlong._resolve(attrs, total_yards)
+
+        located = status == Geofurlong.STATUS_OK
+        coords[located] = Geofurlong._interpolate(attrs, lo[located])
+
+        return coords, status
+
+    @staticmethod
+    def _interpolate(attrs: ELR_Attributes, lo: np.ndarray) -> np.ndarray:
+        """
+        Returns the (N, 2) planar co-ordinates at an array of linear offsets along the centre-line of an ELR.
+        Offsets beyond the end of the centre-line are clamped to its end point.
+        """
+
+        if attrs.cumulative is None:
+            # Fall back to GEOS where the vertex arrays are not available.
+            return shapely.get_coordinates(shapely.line_interpolate_point(attrs.geometry, lo))
+
+        vertices, cumulative = attrs.vertices, attrs.cumulative
+
+        # Binary search for the centre-line segment containing each linear offset.
+        lo = np.clip(lo, 0.0, cumulative[-1])
+        idx = np.clip(np.searchsorted(cumulative, lo, side="right"), 1, len(cumulative) - 1)
+
+        segment_len = cumulative[idx] - cumulative[idx - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(segment_len > 0, (lo - cumulative[idx - 1]) / segment_len, 0.0)
+
+        return vertices[idx - 1] + ratio[:, np.newaxis] * (vertices[idx] - vertices[idx - 1])
+
+    @staticmethod
+    def _interpolate_point(attrs: ELR_Attributes, lo: float) -> Tuple[float, float]:
+        """Returns the planar co-ordinates at a single linear offset along the centre-line of an ELR."""
+
+        if attrs.cumulative is None:
+            # Fall back to GEOS where the vertex arrays are not available.
+            point = attrs.geometry.interpolate(lo)
+            return point.x, point.y
+
+        vertices, cumulative = attrs.vertices, attrs.cumulative
+
+        # Binary search for the centre-line segment containing the linear offset.
+        # Elements are read with `item`, returning Python floats rather than allocating NumPy scalars or views.
+        idx = int(cumulative.searchsorted(lo, side="right"))
+        if idx >= len(cumulative):
+            return vertices.item(-1, 0), vertices.item(-1, 1)
+        if idx < 1:
+            return vertices.item(0, 0), vertices.item(0, 1)
+
+        c0 = cumulative.item(idx - 1)
+        segment_len = cumulative.item(idx) - c0
+        if segment_len <= 0:
+            return vertices.item(idx - 1, 0), vertices.item(idx - 1, 1)
+
+        x0, y0 = vertices.item(idx - 1, 0), vertices.item(idx - 1, 1)
+        ratio = (lo - c0) / segment_len
+        return x0 + ratio * (vertices.item(idx, 0) - x0), y0 + ratio * (vertices.item(idx, 1) - y0)
+
+    @staticmethod
+    def _resolve(attrs: ELR_Attributes, total_yards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the linear offsets and per-row status codes of an array of mileage points on an ELR."""
+
+        status = np.full(len(total_yards), Geofurlong.STATUS_OK, dtype=np.int8)
+        status[(total_yards < attrs.ty_from) | (total_yards > attrs.ty_to)] = Geofurlong.STATUS_OUTWITH_BOUNDS
+
+        # Binary search for the calibration segment containing each of the total yards, as per `_Calibration_Store.linear_offsets`.
+        calibration = attrs.calibration
+        total_yards = np.asarray(total_yards, dtype=np.float64)
+        idx = np.clip(np.searchsorted(calibration["ty_from"], total_yards, side="right") - 1, 0, len(calibration) - 1)
+
+        segments = calibration[idx]
+        lo = _Calibration_Store.segment_offsets(segments["ty_from"], segments["ty_to"], segments["lo_from"], segments["lo_to"], total_yards)
+        status[(status == Geofurlong.STATUS_OK) & np.isnan(lo)] = Geofurlong.STATUS_NO_CALIBRATION
+
+        return lo, status
+
+    def between(self, elr: str, ty_from, ty_to: int, lon_lat: bool = False) -> Optional[shapely.geometry.LineString]:
+        """Returns a portion of the ELR geometry between two mileage points."""
+
+        if ty_to < ty_from:
+            ty_from, ty_to = ty_to, ty_from
+
+        self._validate_elr_mileage(elr, ty_from)
+        self._validate_elr_mileage(elr, ty_to)
+
+        lo_from = self._linear_offset(ty_from)
+        lo_to = self._linear_offset(ty_to)
+
+        if self._elr_attrs.cumulative is None or lo_from == lo_to:
+            # Fall back to GEOS where the vertex arrays are not available, or for a single point.
+            from shapely.ops import substring
+
+            substring_geometry = substring(self._elr_attrs.geometry, lo_from, lo_to)
+        else:
+            coords, _ = Geofurlong._substrings(self._elr_attrs.vertices, self._elr_attrs.cumulative, [lo_from], [lo_to])
+            substring_geometry = shapely.LineString(coords)
+
+        if lon_lat:
+            return self._to_lon_lat_geometry(substring_geometry)
+
+        return substring_geometry
+
+    def between_many(
+        self, elrs: np.ndarray, ty_from: np.ndarray, ty_to: np.ndarray, lon_lat: bool = False, ragged: bool = False
+    ) -> tuple:
+        """
+        Returns portions of ELR geometries between pairs of mileage points, given as parallel arrays of ELRs and total yards.
+        By default, the result is a list of geometries as per `between` (None for rows which cannot be resolved) plus an array of per-row
+        `STATUS_` codes.
+        If `ragged` is set, no geometries are built and the result is instead an (M, 2) co-ordinates array, an (N + 1) offsets array
+        and the status array, with the co-ordinates of row i held in coords[offsets[i]:offsets[i + 1]].
+        """
+
+        elrs = np.asarray(elrs)
+        ty_from = np.asarray(ty_from)
+        ty_to = np.asarray(ty_to)
+
+        if not (elrs.shape == ty_from.shape == ty_to.shape) or elrs.ndim != 1:
+            raise ValueError("elrs, ty_from and ty_to must be one-dimensional arrays of equal length")
+
+        # As per `between`, each portion runs from the lower to the higher mileage.
+        ty_from, ty_to = np.minimum(ty_from, ty_to), np.maximum(ty_from, ty_to)
+
+        counts = np.zeros(len(elrs), dtype=np.int64)
+        portions = []
+
+        elr_index, lo_from, status_from = self._resolve_batch(elrs, ty_from)
+        _, lo_to, status_to = self._resolve_batch(elrs, ty_to)
+        status = np.maximum(status_from, status_to)
+
+        for attrs, rows in self._elr_groups(elr_index, np.flatnonzero(status == Geofurlong.STATUS_OK)):
+            if attrs.cumulative is None:
+                single = rows
+            else:
+                single = rows[lo_from[rows] == lo_to[rows]]
+                rows = rows[lo_from[rows] != lo_to[rows]]
+                group_coords, counts[rows] = Geofurlong._substrings(attrs.vertices, attrs.cumulative, lo_from[rows], lo_to[rows])
+                portions.append((rows, group_coords))
+
+            if len(single) > 0:
+                # Fall back to GEOS as per `between`, where the vertex arrays are not available, or for a single point.
+                from shapely.ops import substring
+
+                substrings = [substring(attrs.geometry, start, end) for start, end in zip(lo_from[single], lo_to[single])]
+                group_coords, indices = shapely.get_coordinates(substrings, return_index=True)
+                counts[single] = np.bincount(indices, minlength=len(single))
+                portions.append((single, group_coords))
+
+        # Scatter the portions of each ELR group into a single ragged array in input order.
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        coords = np.empty((offsets[-1], 2))
+        for rows, group_coords in portions:
+            coords[Geofurlong._ragged_indices(offsets[rows], counts[rows])] = group_coords
+
+        if lon_lat:
+            # Transform all co-ordinates from Planar to Geographic in a single call.
+            coords = self._to_lon_lat(coords)
+
+        if ragged:
+            return coords, offsets, status
+
+        # As per `between`, a portion between two equal linear offsets is a Point rather than a LineString.
+        geometries = np.full(len(elrs), None, dtype=object)
+        points = counts == 1
+        geometries[points] = shapely.points(coords[offsets[:-1][points]])
+        lines = counts > 1
+        line_coords = coords[Geofurlong._ragged_indices(offsets[:-1][lines], counts[lines])]
+        geometries[lines] = shapely.linestrings(line_coords, indices=np.repeat(np.arange(lines.sum()), counts[lines]))
+        return geometries.tolist(), status
+
+    @staticmethod
+    def _line_arrays(geometry: shapely.geometry.LineString) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the vertices of a line as an (N, 2) array, plus the cumulative distance along the line of each vertex."""
+
+        vertices = shapely.get_coordinates(geometry)
+        cumulative = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(vertices, axis=0).T))))
+        return vertices, cumulative
+
+    @staticmethod
+    def _ragged_indices(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Returns the concatenated indices of a number of ranges, each given as a start index and count."""
+
+        ends = np.cumsum(counts)
+        return np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - ends + counts, counts)
+
+    @staticmethod
+    def _substrings(
+        vertices: np.ndarray, cumulative: np.ndarray, lo_from: np.ndarray, lo_to: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the portions of a line between pairs of linear offsets as a ragged array, equivalent to `shapely.ops.substring`.
+        The result is an (M, 2) co-ordinates array, plus the number of co-ordinates within each portion.
+        """
+
+        start = np.clip(np.minimum(lo_from, lo_to), 0.0, cumulative[-1])
+        end = np.clip(np.maximum(lo_from, lo_to), 0.0, cumulative[-1])
+
+        # Vertices strictly between the start and end of each portion.
+        first = np.searchsorted(cumulative, start, side="right")
+        inner = np.maximum(np.searchsorted(cumulative, end, side="left") - first, 0)
+        counts = inner + 2
+        offsets = np.cumsum(counts) - counts
+
+        coords = np.empty((counts.sum(), 2))
+        coords[offsets, 0] = np.interp(start, cumulative, vertices[:, 0])
+        coords[offsets, 1] = np.interp(start, cumulative, vertices[:, 1])
+        coords[offsets + counts - 1, 0] = np.interp(end, cumulative, vertices[:, 0])
+        coords[offsets + counts - 1, 1] = np.interp(end, cumulative, vertices[:, 1])
+        coords[Geofurlong._ragged_indices(offsets + 1, inner)] = vertices[Geofurlong._ragged_indices(first, inner)]
+
+        # Reverse the portions requested from a higher to a lower linear offset.
+        reverse = np.flatnonzero(lo_from > lo_to)
+        if len(reverse) > 0:
+            forward = Geofurlong._ragged_indices(offsets[reverse], counts[reverse])
+            backward = np.repeat(2 * offsets[reverse] + counts[reverse] - 1, counts[reverse]) - forward
+            coords[forward] = coords[backward]
+
+        return coords, counts
+
+    def traverse(self, elr: str, interval: int = 1760) -> Iterator[int]:
+        """
+        Generates an iterator yielding total track yards at the specified interval within the ELR.
+        It always includes the start and end of the ELR, irrespective of the specified interval.
+        """
+
+        ty_from, ty_first, ty_to = self._traverse_limits(elr, interval)
+
+        yield ty_from
+        yield from range(ty_first, ty_to, interval)
+        if ty_to != ty_from:
+            yield ty_to
+
+    def traverse_array(self, elr: str, interval: int = 1760) -> np.ndarray:
+        """
+        Returns an array of the total track yards at the specified interval within the ELR, as per the `traverse` method.
+        The array is suitable for passing directly to the `at_many` method.
+        """
+
+        ty_from, ty_first, ty_to = self._traverse_limits(elr, interval)
+
+        ends = [ty_to] if ty_to != ty_from else []
+        return np.concatenate(([ty_from], np.arange(ty_first, ty_to, interval), ends)).astype(np.int32)
+
+    def traverse_points(self, elr: str, interval: int = 1760, chunk_size: int = 50_000) -> Iterator[ELR_Points]:
+        """
+        Generates chunks of up to `chunk_size` points at the specified interval within the ELR, as per the `traverse` method.
+        Each chunk holds the total yards, planar, and geographic co-ordinates of its points as column arrays,
+        so the whole ELR can be processed in constant memory with each point computed only once.
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise TypeError("chunk_size must be a positive integer above zero")
+
+        ty_from, ty_first, ty_to = self._traverse_limits(elr, interval)
+        points_count = 1 + len(range(ty_first, ty_to, interval)) + (ty_to != ty_from)
+
+        for chunk_start in range(0, points_count, chunk_size):
+            # Position within the traversal of each point, with the start and end of the ELR at either end.
+            position = np.arange(chunk_start, min(chunk_start + chunk_size, points_count))
+            total_yards = ty_first + (position - 1) * interval
+            total_yards[position == 0] = ty_from
+            total_yards[position == points_count - 1] = ty_to
+
+            planar = self._locate_or_raise(elr, total_yards)
+            geographic = self._to_lon_lat(planar)
+
+            yield ELR_Points(
+                elr=elr,
+                total_yards=total_yards.astype(np.int32),
+                easting=planar[:, 0],
+                northing=planar[:, 1],
+                longitude=geographic[:, 0],
+                latitude=geographic[:, 1],
+            )
+
+    def traverse_arrow(self, elr: str, interval: int = 1760, chunk_size: int = 50_000) -> Iterator["pyarrow.RecordBatch"]:
+        """
+        Generates Arrow record batches of up to `chunk_size` points at the specified interval within the ELR, as per `traverse_points`.
+        Each batch has the columns of `ARROW_COLUMNS`, with its numeric columns sharing the buffers of the chunk's column arrays.
+        Requires the optional pyarrow library.
+        """
+
+        Geofurlong._import_pyarrow()
+        metric = self.elr(elr).metric
+
+        for points in self.traverse_points(elr, interval, chunk_size):
+            mileages = [Geofurlong.format_linear(total_yards, metric) for total_yards in points.total_yards.tolist()]
+            yield Geofurlong._arrow_batch(
+                [elr] * len(mileages), points.total_yards, mileages, points.easting, points.northing, points.longitude, points.latitude
+            )
+
+    def locate_batch_arrow(self, elrs: np.ndarray, total_yards: np.ndarray) -> "pyarrow.RecordBatch":
+        """
+        Returns an Arrow record batch of mileage points on any number of ELRs, as per `locate_batch`, in input order.
+        The batch has the columns of `ARROW_COLUMNS` plus `status`, with null mileages and geometries for rows which could not be located.
+        Requires the optional pyarrow library.
+        """
+
+        Geofurlong._import_pyarrow()
+        elrs = np.asarray(elrs)
+        total_yards = np.asarray(total_yards)
+
+        # The total_yards column is int32, so only whole numbers of yards in its range are accepted, rather than being truncated.
+        limits = np.iinfo(np.int32)
+        whole = np.issubdtype(total_yards.dtype, np.integer) or (
+            np.issubdtype(total_yards.dtype, np.floating) and np.array_equal(total_yards, np.trunc(total_yards))
+        )
+        if not whole or (total_yards.size > 0 and (total_yards.min() < limits.min or total_yards.max() > limits.max)):
+            raise TypeError("total_yards must be whole numbers of yards within the range of a 32-bit integer")
+        total_yards = total_yards.astype(np.int32)
+
+        planar, status = self.locate_batch(elrs, total_yards)
+        located = status == Geofurlong.STATUS_OK
+        geographic = np.full((len(elrs), 2), np.nan, order="F")
+        geographic[located] = self._to_lon_lat(planar[located])
+
+        # Metric ELRs have their mileages formatted in kilometres, looked up once per distinct ELR.
+        codes, inverse = np.unique(elrs[located], return_inverse=True)
+        metric = np.zeros(len(elrs), dtype=bool)
+        metric[located] = np.array([self._load_elr(str(code)).metric for code in codes], dtype=bool)[inverse]
+
+        mileages = [
+            Geofurlong.format_linear(ty, row_metric) if row_located else None
+            for ty, row_metric, row_located in zip(total_yards.tolist(), metric.tolist(), located.tolist())
+        ]
+        return Geofurlong._arrow_batch(
+            elrs.tolist(), total_yards, mileages, planar[:, 0], planar[:, 1], geographic[:, 0], geographic[:, 1], status
+        )
+
+    @staticmethod
+    def _import_pyarrow():
+        """Returns the pyarrow module, raising an ImportError explaining that it is optional if not installed."""
+
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("Arrow and GeoParquet output requires the optional pyarrow library") from None
+        return pyarrow
+
+    @staticmethod
+    def _arrow_batch(
+        elrs: List[str],
+        total_yards: np.ndarray,
+        mileages: List[str],
+        x: np.ndarray,
+        y: np.ndarray,
+        lon: np.ndarray,
+        lat: np.ndarray,
+        status: Optional[np.ndarray] = None,
+    ) -> "pyarrow.RecordBatch":
+        """
+        Builds an Arrow record batch of points from their column arrays.
+        Contiguous numeric columns are used by Arrow without copying; strided columns are copied.
+        """
+
+        pa = Geofurlong._import_pyarrow()
+
+        columns = {
+            "elr": pa.array(elrs, pa.string()),
+            "total_yards": pa.array(np.asarray(total_yards, dtype=np.int32)),
+            "mileage": pa.array(mileages, pa.string()),
+            "x": pa.array(x),
+            "y": pa.array(y),
+            "lon": pa.array(lon),
+            "lat": pa.array(lat),
+            "geometry": Geofurlong._wkb_points(lon, lat),
+        }
+        if status is not None:
+            columns["status"] = pa.array(status)
+
+        return pa.RecordBatch.from_pydict(columns)
+
+    @staticmethod
+    def _wkb_points(x: np.ndarray, y: np.ndarray) -> "pyarrow.BinaryArray":
+        """
+        Returns an Arrow array of the (little-endian) WKB Points of arrays of x and y co-ordinates, with nulls for NaN co-ordinates.
+        The WKB of all points is written into a single NumPy buffer, which the Arrow array uses without copying.
+        """
+
+        pa = Geofurlong._import_pyarrow()
+
+        # WKB of a Point: byte order (1 = little-endian), geometry type (1 = Point), x, y.
+        wkb = np.empty(len(x), dtype=[("byte_order", "u1"), ("geometry_type", "<u4"), ("x", "<f8"), ("y", "<f8")])
+        wkb["byte_order"] = 1
+        wkb["geometry_type"] = 1
+        wkb["x"], wkb["y"] = x, y
+        offsets = np.arange(len(x) + 1, dtype=np.int32) * wkb.itemsize
+
+        valid = ~(np.isnan(x) | np.isnan(y))
+        validity = None if valid.all() else pa.py_buffer(np.packbits(valid, bitorder="little"))
+
+        return pa.Array.from_buffers(
+            pa.binary(), len(x), [validity, pa.py_buffer(offsets), pa.py_buffer(wkb)], null_count=int((~valid).sum())
+        )
+
+    def _traverse_limits(self, elr: str, interval: int) -> Tuple[int, int, int]:
+        """Returns the start, first whole interval after the start, and end total yards of a traversal of the ELR."""
+
+        if not isinstance(interval, int) or interval <= 0:
+            raise TypeError("interval must be a positive integer above zero")
+
+        elr_attrs = self.elr(elr)
+        ty_from = elr_attrs.ty_from
+        ty_to = elr_attrs.ty_to
+
+        return ty_from, (ty_from // interval + 1) * interval, ty_to
+
+    def locate_point(self, x: float, y: float, lon_lat: bool = False, max_distance: float = 100.0) -> List[ELR_Location]:
+        """
+        Returns the candidate ELRs and mileages for a co-ordinate, being Easting / Northing, or Longitude / Latitude if `lon_lat` is set.
+        All ELRs with a centre-line within `max_distance` metres of the co-ordinate are returned, nearest first.
+        """
+
+        point = np.array([(x, y)], dtype=np.float64)
+        if lon_lat:
+            point = self._to_planar(point)
+
+        index = self._elr_spatial_index()
+
+        # Candidate pieces of centre-line within the distance, refined to the nearest point on each.
+        pieces = index.tree.query(shapely.Point(point[0]), predicate="dwithin", distance=max_distance)
+        distances, linear_offsets = Geofurlong._project(index, pieces, np.repeat(point, len(pieces), axis=0))
+
+        # Retain the nearest piece of each ELR.
+        order = np.lexsort((distances, index.piece_elr[pieces]))
+        nearest = order[np.unique(index.piece_elr[pieces][order], return_index=True)[1]]
+
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        elrs = [index.elr_codes[elr_idx] for elr_idx in index.piece_elr[pieces[nearest]]]
+
+        store = self._calibrations()
+        total_yards = store.total_yards_at(store.elr_index(elrs), linear_offsets[nearest])
+
+        locations = []
+        for elr, ty, candidate in zip(elrs, total_yards, nearest):
+            locations.append(
+                ELR_Location(
+                    elr=elr,
+                    total_yards=None if np.isnan(ty) else int(round(ty)),
+                    distance=float(distances[candidate]),
+                )
+            )
+
+        return locations
+
+    def locate_points(
+        self, x: np.ndarray, y: np.ndarray, lon_lat: bool = False, max_distance: float = 100.0, chunk_size: int = 100_000
+    ) -> ELR_Locations:
+        """
+        Returns the nearest ELR and mileage of each of an array of co-ordinates, as per the `locate_point` method.
+        The co-ordinates are processed in chunks of `chunk_size`, bounding the working memory regardless of the input size.
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise TypeError("chunk_size must be a positive integer above zero")
+
+        points = np.column_stack((np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)))
+
+        locations = ELR_Locations(
+            elr=np.full(len(points), "", dtype="<U4"),
+            total_yards=np.full(len(points), np.nan),
+            distance=np.full(len(points), np.nan),
+        )
+
+        for chunk_start in range(0, len(points), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            planar = self._to_planar(points[chunk]) if lon_lat else points[chunk]
+            locations.elr[chunk], locations.total_yards[chunk], locations.distance[chunk] = self._locate_nearest(planar, max_distance)
+
+        return locations
+
+    def locate_points_csv(
+        self,
+        in_csv_fn: str,
+        out_csv_fn: str,
+        x_column: str = "x",
+        y_column: str = "y",
+        lon_lat: bool = False,
+        max_distance: float = 100.0,
+        chunk_size: int = 100_000,
+    ) -> int:
+        """
+        Streams a CSV file of co-ordinates to a copy with the nearest `elr`, `total_yards`, `mileage`, and `distance` columns appended.
+        The file is read and written in chunks of `chunk_size` rows, so memory usage is bounded regardless of its size.
+        Returns the number of rows written.
+        """
+
+        rows_written = 0
+
+        with open(in_csv_fn, newline="") as in_csv, open(out_csv_fn, "w", newline="") as out_csv:
+            reader = csv.reader(in_csv)
+            writer = csv.writer(out_csv)
+
+            header = next(reader)
+            if x_column not in header or y_column not in header:
+                raise ValueError(f"CSV file {in_csv_fn} does not have both {x_column} and {y_column} columns")
+            x_index, y_index = header.index(x_column), header.index(y_column)
+            writer.writerow(header + ["elr", "total_yards", "mileage", "distance"])
+
+            for rows in Geofurlong._chunks(Geofurlong._csv_rows(reader, in_csv_fn, max(x_index, y_index) + 1), chunk_size):
+                x = np.array([row[x_index] for row in rows], dtype=np.float64)
+                y = np.array([row[y_index] for row in rows], dtype=np.float64)
+                locations = self.locate_points(x, y, lon_lat=lon_lat, max_distance=max_distance, chunk_size=chunk_size)
+
+                # Metric ELRs have their mileages formatted in kilometres, looked up once per distinct ELR.
+                located = ~np.isnan(locations.total_yards)
+                codes, inverse = np.unique(locations.elr[located], return_inverse=True)
+                metric = np.zeros(len(rows), dtype=bool)
+                metric[located] = np.array([self._load_elr(str(code)).metric for code in codes], dtype=bool)[inverse]
+
+                for row, elr, total_yards, distance, row_metric in zip(
+                    rows, locations.elr.tolist(), locations.total_yards.tolist(), locations.distance.tolist(), metric.tolist()
+                ):
+                    if np.isnan(total_yards):
+                        writer.writerow(row + [elr, "", "", "" if np.isnan(distance) else f"{distance:.3f}"])
+                    else:
+                        mileage = Geofurlong.format_linear(int(total_yards), row_metric)
+                        writer.writerow(row + [elr, int(total_yards), mileage, f"{distance:.3f}"])
+
+                rows_written += len(rows)
+
+        return rows_written
+
+    def geocode_csv(
+        self,
+        in_csv_fn: str,
+        out_csv_fn: str,
+        elr_column: str = "elr",
+        mileage_column: str = "mileage",
+        total_yards_column: Optional[str] = None,
+        lon_lat: bool = False,
+        chunk_size: int = 100_000,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Streams a CSV file of ELRs and mileages to a copy with the `x`, `y`, and `status` (a `STATUS_` code) columns appended.
+        Mileages are decimal (of form mmm.yyyy), or total yards if `total_yards_column` is given; rows which cannot be located have empty co-ordinates.
+        The file is read, located (with `locate_batch`), and written in chunks of `chunk_size` rows, so memory usage is bounded regardless of its size.
+        The optional `progress` function is called with the number of rows written after each chunk. Returns the number of rows written.
+        """
+
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise TypeError("chunk_size must be a positive integer above zero")
 
-        if metric:
-            fkm = ty_from / Geofurlong.YARDS_IN_MILE * Geofurlong.KM_IN_MILE
-            tkm = ty_to / Geofurlong.YARDS_IN_MILE * Geofurlong.KM_IN_MILE
-            formatted_range = f"{fkm:.3f}km - {tkm:.3f}km (equivalent to {Geofurlong.mileage_verbose(fm, fy, tm, ty)})"
-        else:
-            formatted_range = Geofurlong.mileage_verbose(fm, fy, tm, ty)
+        rows_written = 0
+        ty_column = total_yards_column if total_yards_column is not None else mileage_column
+        coordinate_format = "%.7f" if lon_lat else "%.3f"
 
-        trackmaps = [(book, Geofurlong.trackmap_coverage(book)) for book in row_elr[trackmaps_index].split(";")]
+        with open(in_csv_fn, newline="") as in_csv, open(out_csv_fn, "w", newline="") as out_csv:
+            reader = csv.reader(in_csv)
+            writer = csv.writer(out_csv)
 
-        attrs = ELR_Attributes(
-            elr=elr,
-            ty_from=ty_from,
-            ty_to=ty_to,
-            metric=metric,
-            formatted_range=formatted_range,
-            measured_len_km=row_elr[elr_shape_len_m] / 1_000,
-            route=row_elr[route_index],
-            section=row_elr[section_index],
-            remarks=row_elr[remarks_index],
-            trackmaps=trackmaps,
-            grouping=row_elr[grouping_index].split(";"),
-            neighbours=row_elr[neighbours_index].split(";"),
-            geometry=shapely.wkb.loads(row_elr[elr_geometry_index]),
-            calibration=np.empty(0),
-        )
+            header = next(reader)
+            if elr_column not in header or ty_column not in header:
+                raise ValueError(f"CSV file {in_csv_fn} does not have both {elr_column} and {ty_column} columns")
+            elr_index, ty_index = header.index(elr_column), header.index(ty_column)
+            writer.writerow(header + ["x", "y", "status"])
 
-        # Load the ELR calibration data (sorted by mileage / kilometreage) into a numpy array.
-        sql_calibration = (
-            "SELECT total_yards_from, total_yards_to, linear_offset_from_m, linear_offset_to_m "
-            "FROM calibration WHERE elr=? "
-            "ORDER BY total_yards_from"
-        )
+            for rows in Geofurlong._chunks(Geofurlong._csv_rows(reader, in_csv_fn, max(elr_index, ty_index) + 1), chunk_size):
+                elrs = np.array([row[elr_index] for row in rows], dtype=str)
+                values = [row[ty_index] for row in rows]
+                if total_yards_column is not None:
+                    total_yards = Geofurlong._parse_numbers(values)
+                else:
+                    total_yards = Geofurlong._parse_mileages(values)
 
-        cursor_calibration = self._geo_db.execute(sql_calibration, (elr,))
-        rows_calibration = cursor_calibration.fetchall()
+                # Mileages which are not a whole number of yards are reported as invalid, unless the ELR itself is invalid or unknown.
+                valid = np.isfinite(total_yards) & (total_yards == np.round(total_yards))
+                coords, status = self.locate_batch(elrs, np.where(valid, total_yards, 0).astype(np.int64), lon_lat)
+                elr_known = (status != Geofurlong.STATUS_INVALID_ELR) & (status != Geofurlong.STATUS_UNKNOWN_ELR)
+                status[~valid & elr_known] = Geofurlong.STATUS_INVALID_MILEAGE
 
-        if len(rows_calibration) == 0:
-            raise ValueError(f"No calibration data for {elr}")
+                x = np.char.mod(coordinate_format, coords[:, 0])
+                y = np.char.mod(coordinate_format, coords[:, 1])
+                x[status != Geofurlong.STATUS_OK] = ""
+                y[status != Geofurlong.STATUS_OK] = ""
 
-        attrs.calibration = np.array(
-            rows_calibration,
-            dtype=[
-                ("ty_from", np.int32),
-                ("ty_to", np.int32),
-                ("lo_from", np.float32),
-                ("lo_to", np.float32),
-            ],
-        )
+                writer.writerows(row + [row_x, row_y, row_status] for row, row_x, row_y, row_status in zip(rows, x.tolist(), y.tolist(), status.tolist()))
 
-        self._elr_cache[elr] = attrs  # Add to cache.
-        self._elr_attrs = attrs  # Set "current" ELR.
-        return self.properties
+                rows_written += len(rows)
+                if progress is not None:
+                    progress(rows_written)
 
-    def _linear_offset(self, ty: int) -> float:
-        """Returns the linear offset of a mileage point (expressed as total yards) of the current ELR."""
+        return rows_written
 
-        # Binary search for the calibration segment containing the total yards.
-        idx = np.searchsorted(self._elr_attrs.calibration["ty_from"], ty, side="right") - 1
+    @staticmethod
+    def _parse_numbers(values: List[str]) -> np.ndarray:
+        """Returns an array of numbers parsed from strings, with NaN for any which are not numbers."""
+
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            # Fall back to parsing each value, only if any value is not a number.
+            parsed = np.empty(len(values))
+            for i, value in enumerate(values):
+                try:
+                    parsed[i] = float(value)
+                except ValueError:
+                    parsed[i] = np.nan
+            return parsed
 
-        if idx < 0 or ty > self._elr_attrs.calibration["ty_to"][idx]:
-            m, y = Geofurlong.split_total_yards(ty)
-            elr_range = self._elr_attrs.formatted_range
-            raise ValueError(f"No calibration data for {self._elr_attrs.elr} segment {Geofurlong.fmt(m, y)}: {elr_range}")
+    @staticmethod
+    def _parse_mileages(values: List[str]) -> np.ndarray:
+        """Returns an array of total yards parsed from decimal mileages (of form mmm.yyyy), as per `miles_yards_to_total_yards`, with NaN for any which are not numbers."""
 
-        ty_from = self._elr_attrs.calibration["ty_from"][idx]
-        ty_to = self._elr_attrs.calibration["ty_to"][idx]
-        lo_from = self._elr_attrs.calibration["lo_from"][idx]
-        lo_to = self._elr_attrs.calibration["lo_to"][idx]
-        linear_offset = lo_from + ((ty - ty_from) / (ty_to - ty_from) * (lo_to - lo_from))
+        miles_yards = Geofurlong._parse_numbers(values)
+        miles = np.trunc(miles_yards)
+        with np.errstate(invalid="ignore"):
+            # Infinite mileages become NaN.
+            return np.round(Geofurlong.YARDS_IN_MILE * miles + 10_000 * (miles_yards - miles))
 
-        return linear_offset
+    @staticmethod
+    def _csv_rows(reader: "csv.reader", csv_fn: str, columns: int) -> Iterator[List[str]]:
+        """Generates the rows of a CSV file, skipping blank lines and raising a ValueError for any row of fewer than `columns` columns."""
 
-    def _validate_elr_mileage(self, elr: str, ty: int) -> None:
-        """Checks that the requested mileage is within the ELR limits."""
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < columns:
+                raise ValueError(f"Line {reader.line_num} of CSV file {csv_fn} has {len(row)} columns, rather than at least {columns}")
+            yield row
 
-        # Check ELR code is valid/available and miles/yards are valid.
-        self.elr(elr)
+    @staticmethod
+    def _chunks(iterable: Iterator, chunk_size: int) -> Iterator[list]:
+        """Generates lists of up to `chunk_size` consecutive items from an iterable."""
 
-        # Check the requested mileage is within the ELR limits.
-        if (ty < self._elr_attrs.ty_from) or (ty > self._elr_attrs.ty_to):
-            ty_mileage = Geofurlong.format_total_yards(ty)
-            elr_start = Geofurlong.format_total_yards(self._elr_attrs.ty_from)
-            elr_end = Geofurlong.format_total_yards(self._elr_attrs.ty_to)
+        chunk = []
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
 
-            raise ValueError(
-                f"Mileage of {ty_mileage} [{ty}] on ELR {self._elr_attrs.elr} outwith valid bounds: {elr_start} [{self._elr_attrs.ty_from}] - {elr_end} [{self._elr_attrs.ty_to}]"
-            )
+        if chunk:
+            yield chunk
 
-    def at(self, elr: str, ty: int, lon_lat: bool = False) -> Optional[shapely.geometry.Point]:
-        """Returns the point geometry of a mileage point on an ELR."""
+    def _locate_nearest(self, points: np.ndarray, max_distance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the nearest ELR code, total yards, and distance of each of an (N, 2) array of planar co-ordinates."""
 
-        self._validate_elr_mileage(elr, ty)
-        lo = self._linear_offset(ty)
-        point_geometry = self._elr_attrs.geometry.interpolate(lo)
+        index = self._elr_spatial_index()
 
-        if lon_lat:
-            # Transform geometry from Planar to Geographic.
-            return transform(self._transformer.transform, point_geometry)
+        elr = np.full(len(points), "", dtype="<U4")
+        total_yards = np.full(len(points), np.nan)
+        distance = np.full(len(points), np.nan)
 
-        return point_geometry
+        # Nearest piece of centre-line to each point, omitting points with no piece within the distance.
+        located, pieces = index.tree.query_nearest(shapely.points(points), max_distance=max_distance, all_matches=False)
+        distance[located], linear_offsets = Geofurlong._project(index, pieces, points[located])
+        elr[located] = np.array(index.elr_codes)[index.piece_elr[pieces]]
 
-    def between(self, elr: str, ty_from, ty_to: int, lon_lat: bool = False) -> Optional[shapely.geometry.LineString]:
-        """Returns a portion of the ELR geometry between two mileage points."""
+        # Convert the linear offsets to total yards using the calibration of all ELRs at once.
+        store = self._calibrations()
+        total_yards[located] = store.total_yards_at(store.elr_index(elr[located]), linear_offsets)
 
-        if ty_to < ty_from:
-            ty_from, ty_to = ty_to, ty_from
+        return elr, np.round(total_yards), distance
 
-        self._validate_elr_mileage(elr, ty_from)
-        self._validate_elr_mileage(elr, ty_to)
+    def elrs_in_bbox(self, minx: float, miny: float, maxx: float, maxy: float, lon_lat: bool = False) -> List[ELR_Range]:
+        """
+        Returns the mileage ranges of all ELRs running through a bounding box, ordered by ELR code and mileage.
+        The bounding box is given as Easting / Northing limits, or Longitude / Latitude limits if `lon_lat` is set.
+        """
 
-        lo_from = self._linear_offset(ty_from)
-        lo_to = self._linear_offset(ty_to)
+        area = shapely.box(minx, miny, maxx, maxy)
+        if lon_lat:
+            # Densify the edges, so the transformed bounding box follows the curvature of the lines of longitude and latitude.
+            area = self._to_planar_geometry(shapely.segmentize(area, max(maxx - minx, maxy - miny) / 100))
+
+        return self._elrs_in_area(area)
 
-        substring_geometry = substring(self._elr_attrs.geometry, lo_from, lo_to)
+    def elrs_within(self, x: float, y: float, radius: float, lon_lat: bool = False) -> List[ELR_Range]:
+        """
+        Returns the mileage ranges of all ELRs within `radius` metres of a co-ordinate, ordered by ELR code and mileage.
+        The co-ordinate is Easting / Northing, or Longitude / Latitude if `lon_lat` is set.
+        """
 
+        point = np.array([(x, y)], dtype=np.float64)
         if lon_lat:
-            return transform(self._transformer.transform, substring_geometry)
+            point = self._to_planar(point)
+
+        return self._elrs_in_area(shapely.Point(point[0]).buffer(radius, quad_segs=64))
+
+    def _elrs_in_area(self, area: shapely.geometry.Polygon) -> List[ELR_Range]:
+        """Returns the mileage ranges of all ELRs within a planar area, ordered by ELR code and mileage."""
+
+        index = self._elr_spatial_index()
+
+        # Clip the candidate pieces of centre-line to the area, ignoring any which only touch it at a point.
+        pieces = index.tree.query(area, predicate="intersects")
+        parts, owner = shapely.get_parts(shapely.intersection(index.tree.geometries[pieces], area), return_index=True)
+        linear = shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING
+        parts, pieces = parts[linear], pieces[owner[linear]]
+
+        # Linear offsets along the ELR of either end of each clipped part.
+        _, lo_start = Geofurlong._project(index, pieces, shapely.get_coordinates(shapely.get_point(parts, 0)))
+        _, lo_end = Geofurlong._project(index, pieces, shapely.get_coordinates(shapely.get_point(parts, -1)))
+        lo_start, lo_end = np.minimum(lo_start, lo_end), np.maximum(lo_start, lo_end)
+        piece_elr = index.piece_elr[pieces]
+
+        ranges = []
+        for elr_idx in np.unique(piece_elr):
+            elr = index.elr_codes[elr_idx]
+            in_elr = piece_elr == elr_idx
+            order = np.argsort(lo_start[in_elr], kind="stable")
+
+            # Merge the parts which adjoin or overlap, as adjacent pieces share their end vertices.
+            merged = []
+            for start, end in zip(lo_start[in_elr][order], lo_end[in_elr][order]):
+                if merged and start <= merged[-1][1] + Geofurlong.LINEAR_OFFSET_TOLERANCE_M:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+
+            # Mileages are NaN where the ELR has no calibration data.
+            merged = np.array(merged).ravel()
+            store = self._calibrations()
+            total_yards = store.total_yards_at(np.repeat(store.elr_index([elr]), len(merged)), merged)
+
+            for ty_from, ty_to in total_yards.reshape(-1, 2):
+                ranges.append(
+                    ELR_Range(
+                        elr=elr,
+                        ty_from=None if np.isnan(ty_from) else int(round(ty_from)),
+                        ty_to=None if np.isnan(ty_to) else int(round(ty_to)),
+                    )
+                )
+
+        return ranges
+
+    def _elr_spatial_index(self) -> _ELR_Spatial_Index:
+        """
+        Returns the spatial index of the centre-lines of all ELRs, building it once, on first use, for all spatial queries.
+        This decodes every centre-line (directly, rather than through the ELR cache), and holds all their vertices plus the pieces'
+        geometries and tree for the life of the API.
+        """
 
-        return substring_geometry
+        if self._spatial_index is None:
+            if self._snapshot is not None:
+                elr_codes, geometries = self.elr_codes, self._snapshot.geometries()
+            else:
+                cursor = self._geo_db.execute("SELECT elr, geometry FROM elr ORDER BY elr")
+                elr_codes, wkbs = zip(*cursor.fetchall())
+                geometries = shapely.from_wkb(np.array(wkbs, dtype=object))
+            self._spatial_index = _ELR_Spatial_Index.build(elr_codes, geometries)
 
-    def traverse(self, elr: str, interval: int = 1760) -> Iterator[int]:
+        return self._spatial_index
+
+    @staticmethod
+    def _project(index: _ELR_Spatial_Index, pieces: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Generates an iterator yielding total track yards at the specified interval within the ELR.
-        It always includes the start and end of the ELR, irrespective of the specified interval.
+        Returns the distance from each point to the nearest point on its paired piece of centre-line,
+        plus the linear offset of that nearest point along the ELR.
         """
 
-        if not isinstance(interval, int) or interval <= 0:
-            raise TypeError("interval must be a positive integer above zero")
+        # Every segment of every piece, paired with the point to project onto it.
+        segment_counts = index.piece_end[pieces] - index.piece_start[pieces]
+        segments = Geofurlong._ragged_indices(index.piece_start[pieces], segment_counts)
+        owner = np.repeat(np.arange(len(pieces)), segment_counts)
 
-        elr_attrs = self.elr(elr)
-        ty_from = elr_attrs.ty_from
-        ty_to = elr_attrs.ty_to
+        a = index.vertices[segments]
+        ab = index.vertices[segments + 1] - a
+        ap = points[owner] - a
+        segment_len2 = np.einsum("ij,ij->i", ab, ab)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.clip(np.where(segment_len2 > 0, np.einsum("ij,ij->i", ap, ab) / segment_len2, 0.0), 0.0, 1.0)
+        distance = np.hypot(*(ap - ratio[:, np.newaxis] * ab).T)
 
-        for i in range(ty_from, ty_to + 1):
-            if i == ty_from or i == ty_to or i % interval == 0:
-                yield i
+        # Nearest segment of each piece (segments are already grouped by piece).
+        order = np.lexsort((distance, owner))
+        nearest = order[np.searchsorted(owner[order], np.arange(len(pieces)))]
+
+        linear_offset = index.cumulative[segments[nearest]] + ratio[nearest] * np.sqrt(segment_len2[nearest])
+        return distance[nearest], linear_offset
 
     @staticmethod
     def valid_elr(elr: str) -> bool:
@@ -452,3 +2542,745 @@ class Geofurlong:
             raise ValueError(f"Book {book} not found in coverage")
 
         return coverage[book]
+
+
+class GeoJSON_Writer:
+    """
+    Streaming writer of GeoJSON features, as a FeatureCollection or newline-delimited GeoJSON (one feature per line).
+    Features are written as they are given, directly from co-ordinate arrays, so memory usage is bounded regardless of the number of features.
+    """
+
+    def __init__(self, fn: str, ndjson: bool = False, lon_lat: bool = True, precision: Optional[int] = None):
+        """
+        Opens a GeoJSON file for writing, of Geographic (by default) or Planar co-ordinates.
+        Co-ordinates are written to `precision` decimal places, by default 7 for Geographic (about 1 cm) and 3 for Planar (1 mm).
+        """
+
+        # Whether features are newline-delimited, rather than within a FeatureCollection.
+        self.ndjson = ndjson
+
+        # Whether the co-ordinates are Geographic, rather than Planar.
+        self.lon_lat = lon_lat
+
+        # Number of features written.
+        self.count = 0
+
+        precision = precision if precision is not None else (7 if lon_lat else 3)
+        if not isinstance(precision, int) or precision < 0:
+            raise ValueError("precision must be a non-negative integer")
+
+        # Format of a pair of co-ordinates.
+        self._coordinate_format = f"[%.{precision}f,%.{precision}f]"
+
+        self._file = open(fn, "w")
+        if not ndjson:
+            header = {"type": "FeatureCollection"}
+            if not lon_lat:
+                # Planar co-ordinates are not the GeoJSON default (WGS 84), so are named as per the legacy `crs` member.
+                header["crs"] = {"type": "name", "properties": {"name": "urn:ogc:def:crs:EPSG::27700"}}
+            self._file.write(json.dumps(header)[:-1] + ', "features": [\n')
+
+    def __enter__(self) -> "GeoJSON_Writer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Completes and closes the file."""
+
+        if self._file.closed:
+            return
+
+        if not self.ndjson:
+            self._file.write("\n]}\n")
+        self._file.close()
+
+    def write_points(self, points: ELR_Points, metric: bool = False):
+        """
+        Writes a Point feature for each point of an `ELR_Points` chunk (as generated by `traverse_points`),
+        with `elr`, `total_yards`, `mileage`, and `elr_mileage` properties. Metric ELRs have their mileages formatted in kilometres.
+        """
+
+        coords = np.column_stack((points.longitude, points.latitude) if self.lon_lat else (points.easting, points.northing))
+        mileages = [Geofurlong.format_linear(total_yards, metric) for total_yards in points.total_yards.tolist()]
+
+        self.write_coordinates(
+            coords,
+            {
+                "elr": [points.elr] * len(mileages),
+                "total_yards": points.total_yards,
+                "mileage": mileages,
+                "elr_mileage": [f"{points.elr} {mileage}" for mileage in mileages],
+            },
+        )
+
+    def write_coordinates(self, coords: np.ndarray, properties: Optional[dict] = None):
+        """
+        Writes a Point feature for each row of an (N, 2) co-ordinates array (as returned by `at_many` or `locate_batch`),
+        with properties given as a dictionary of columns of N values each. Rows with NaN co-ordinates are skipped.
+        """
+
+        coords = np.asarray(coords, dtype=np.float64)
+        properties = properties or {}
+        for name, column in properties.items():
+            if len(column) != len(coords):
+                raise ValueError(f"Property {name} does not have a value for each of the {len(coords)} co-ordinates")
+
+        # Each property is encoded once, as the "name": value JSON text of each row.
+        encoded = [[f"{json.dumps(name)}: {json.dumps(value)}" for value in np.asarray(column).tolist()] for name, column in properties.items()]
+        located = ~np.isnan(coords).any(axis=1)
+
+        for row, (x, y) in zip(np.flatnonzero(located).tolist(), coords[located].tolist()):
+            coordinates = self._coordinate_format % (x, y)
+            self._write_feature('{"type": "Point", "coordinates": ' + coordinates + "}", ", ".join(column[row] for column in encoded))
+
+    def write_geometry(self, geometry: shapely.geometry.base.BaseGeometry, properties: Optional[dict] = None):
+        """
+        Writes a feature of a Point or LineString geometry (as returned by `at` or `between`), with optional properties.
+        Any other geometry type is written as encoded by Shapely, at full precision.
+        """
+
+        geometry_type = geometry.geom_type
+        if geometry_type in ("Point", "LineString"):
+            pairs = [self._coordinate_format % (x, y) for x, y in shapely.get_coordinates(geometry).tolist()]
+            coordinates = pairs[0] if geometry_type == "Point" else "[" + ",".join(pairs) + "]"
+            geometry_json = f'{{"type": "{geometry_type}", "coordinates": {coordinates}}}'
+        else:
+            geometry_json = shapely.to_geojson(geometry)
+
+        self._write_feature(geometry_json, json.dumps(properties or {})[1:-1])
+
+    def _write_feature(self, geometry_json: str, properties_json: str):
+        """Writes a feature, from the JSON text of its geometry and of the members of its properties object."""
+
+        separator = "" if self.ndjson or self.count == 0 else ",\n"
+        self._file.write(f'{separator}{{"type": "Feature", "geometry": {geometry_json}, "properties": {{{properties_json}}}}}')
+        if self.ndjson:
+            self._file.write("\n")
+        self.count += 1
+
+
+class GeoParquet_Writer:
+    """
+    Streaming writer of Arrow record batches (from `traverse_arrow` or `locate_batch_arrow`) to a GeoParquet file.
+    Batches are buffered into row groups of `row_group_size` rows, however small the batches written. Requires the optional pyarrow library.
+    """
+
+    # GeoParquet metadata of the WKB Point `geometry` column, of Geographic co-ordinates (the default OGC:CRS84 when no CRS is given).
+    GEO_METADATA = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["Point"]}},
+    }
+
+    def __init__(self, fn: str, row_group_size: int = 131_072, compression: str = "zstd"):
+        """Opens a GeoParquet file for writing, which is created when the first batch is written."""
+
+        Geofurlong._import_pyarrow()
+
+        if not isinstance(row_group_size, int) or row_group_size <= 0:
+            raise ValueError("row_group_size must be a positive integer above zero")
+
+        # GeoParquet file name.
+        self.fn = fn
+
+        # Number of rows of each row group, other than the last.
+        self.row_group_size = row_group_size
+
+        # Parquet compression codec.
+        self.compression = compression
+
+        # Number of rows written.
+        self.count = 0
+
+        # Parquet writer, opened with the schema of the first batch.
+        self._writer = None
+
+        # Batches buffered until a whole row group can be written.
+        self._batches = []
+        self._buffered_rows = 0
+
+    def __enter__(self) -> "GeoParquet_Writer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, batch: "pyarrow.RecordBatch"):
+        """Writes a record batch, buffering its rows until a whole row group can be written."""
+
+        import pyarrow.parquet
+
+        if self._writer is None:
+            metadata = dict(batch.schema.metadata or {})
+            metadata[b"geo"] = json.dumps(GeoParquet_Writer.GEO_METADATA).encode()
+            self._writer = pyarrow.parquet.ParquetWriter(self.fn, batch.schema.with_metadata(metadata), compression=self.compression)
+
+        self._batches.append(batch)
+        self._buffered_rows += batch.num_rows
+        self.count += batch.num_rows
+
+        if self._buffered_rows >= self.row_group_size:
+            self._flush(whole_row_groups=True)
+
+    def close(self):
+        """Writes any buffered rows as the last row group, and closes the file."""
+
+        if self._writer is None:
+            return
+
+        self._flush(whole_row_groups=False)
+        self._writer.close()
+        self._writer = None
+
+    def _flush(self, whole_row_groups: bool):
+        """Writes the buffered rows as row groups, leaving any part of a row group buffered if only whole row groups are to be written."""
+
+        pa = Geofurlong._import_pyarrow()
+
+        table = pa.Table.from_batches(self._batches)
+        rows = (table.num_rows // self.row_group_size) * self.row_group_size if whole_row_groups else table.num_rows
+        if rows > 0:
+            self._writer.write_table(table.slice(0, rows), row_group_size=self.row_group_size)
+
+        remainder = table.slice(rows)
+        self._batches = remainder.to_batches() if remainder.num_rows > 0 else []
+        self._buffered_rows = remainder.num_rows
+
+
+class _Thread_Local:
+    """Descriptor holding a separate value of an attribute for each thread, created by a factory on first use within each thread."""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def _local(self, obj) -> threading.local:
+        # The per-thread values of all such attributes of an object are held together, created with the first of them.
+        return obj.__dict__.setdefault("_thread_local", threading.local())
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        local = self._local(obj)
+        try:
+            return getattr(local, self._name)
+        except AttributeError:
+            value = self._factory(obj)
+            setattr(local, self._name, value)
+            return value
+
+    def __set__(self, obj, value):
+        setattr(self._local(obj), self._name, value)
+
+
+class ThreadSafeGeofurlong(Geofurlong):
+    """
+    Geofurlong API which may be shared by any number of threads.
+    Each thread has its own current ELR, read-only database connection, and co-ordinate transformers (opened on first use by the thread),
+    whilst the ELR cache, network-wide calibration, and spatial index are shared, and guarded by locks.
+    """
+
+    # Per-thread state.
+    _geo_db = _Thread_Local(lambda gf: None if gf._snapshot is not None else Geofurlong._connect(gf._db_fn))
+    _elr_attrs = _Thread_Local(lambda gf: ELR_Attributes())
+    _lon_lat_transformer = _Thread_Local(lambda gf: None)
+    _planar_transformer = _Thread_Local(lambda gf: None)
+
+    def __init__(self, db_fn: str = "geofurlong.sqlite", cache_max_entries: Optional[int] = None, cache_max_bytes: Optional[int] = None):
+        """API constructor, as per `Geofurlong`."""
+
+        # Database opened by each thread.
+        self._db_fn = db_fn
+
+        super().__init__(db_fn, cache_max_entries, cache_max_bytes)
+
+    def _setup(self, cache_max_entries: Optional[int], cache_max_bytes: Optional[int]):
+        """Sets up the state common to both API constructors, with a cache and locks shared by all threads."""
+
+        # Guards the building of the network-wide calibration, spatial index, and compiled snapshot.
+        self._build_lock = threading.Lock()
+
+        super()._setup(cache_max_entries, cache_max_bytes)
+        self._elr_cache = _Locked_ELR_Cache(cache_max_entries, cache_max_bytes)
+
+    def _calibrations(self) -> _Calibration_Store:
+        if self._calibration_store is None:
+            with self._build_lock:
+                return super()._calibrations()
+        return self._calibration_store
+
+    def _compiled(self) -> _Snapshot:
+        if self._compiled_snapshot is None:
+            # The calibration is built first, as it takes the same (non-reentrant) lock.
+            self._calibrations()
+            with self._build_lock:
+                return super()._compiled()
+        return self._compiled_snapshot
+
+    def _elr_spatial_index(self) -> _ELR_Spatial_Index:
+        if self._spatial_index is None:
+            with self._build_lock:
+                return super()._elr_spatial_index()
+        return self._spatial_index
+
+
+class AsyncGeofurlong:
+    """
+    asyncio facade of the Geofurlong API, running lookups in a bounded pool of threads so the event loop is never blocked.
+    Concurrent `at` requests arriving within `batch_window` seconds are coalesced into a single `locate_batch` call.
+    """
+
+    def __init__(
+        self,
+        gf: Optional[ThreadSafeGeofurlong] = None,
+        max_workers: int = 4,
+        max_pending: int = 10_000,
+        batch_window: float = 0.002,
+        max_batch_size: int = 10_000,
+    ):
+        """
+        Asynchronous API constructor, wrapping a thread-safe API (by default, opening the default database).
+        Once `max_pending` requests are in progress, further requests wait until earlier requests complete (backpressure).
+        """
+
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        if max_workers <= 0 or max_pending <= 0 or max_batch_size <= 0:
+            raise ValueError("max_workers, max_pending, and max_batch_size must be above zero")
+
+        if batch_window < 0:
+            raise ValueError("batch_window must not be negative")
+
+        # Synchronous API, shared by the threads of the executor.
+        self.geofurlong = gf if gf is not None else ThreadSafeGeofurlong()
+
+        # Seconds to wait for further `at` requests to coalesce with the first of a batch.
+        self.batch_window = batch_window
+
+        # Maximum number of `at` requests coalesced into a batch, which is run as soon as full.
+        self.max_batch_size = max_batch_size
+
+        # Executor running the synchronous API calls.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geofurlong")
+
+        # Limits the number of requests in progress.
+        self._pending = asyncio.Semaphore(max_pending)
+
+        # `at` requests awaiting their batch (ELR, total yards, and future of each), by whether Geographic co-ordinates are requested.
+        self._batches = {False: [], True: []}
+
+        # Timer running the current batch, by whether Geographic co-ordinates are requested.
+        self._batch_timers = {False: None, True: None}
+
+        # Batches in progress, referenced until complete.
+        self._batch_tasks = set()
+
+    async def __aenter__(self) -> "AsyncGeofurlong":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Runs any batches still waiting, then shuts down the executor once all requests are complete."""
+
+        import asyncio
+
+        for lon_lat in (False, True):
+            self._run_batch(lon_lat)
+
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def at(self, elr: str, ty: int, lon_lat: bool = False) -> shapely.geometry.Point:
+        """Returns the co-ordinates of a mileage point (expressed as total yards) on an ELR, as per `Geofurlong.at`."""
+
+        import asyncio
+
+        async with self._pending:
+            future = asyncio.get_running_loop().create_future()
+            batch = self._batches[lon_lat]
+            batch.append((elr, ty, future))
+
+            if len(batch) >= self.max_batch_size:
+                self._run_batch(lon_lat)
+            elif self._batch_timers[lon_lat] is None:
+                self._batch_timers[lon_lat] = asyncio.get_running_loop().call_later(self.batch_window, self._run_batch, lon_lat)
+
+            return await future
+
+    async def at_many(self, elr: str, total_yards: np.ndarray, lon_lat: bool = False) -> np.ndarray:
+        """Returns the co-ordinates of an array of mileage points on an ELR, as per `Geofurlong.at_many`."""
+
+        return await self._call(self.geofurlong.at_many, elr, total_yards, lon_lat)
+
+    async def locate_batch(self, elrs: np.ndarray, total_yards: np.ndarray, lon_lat: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the co-ordinates and per-row status codes of mileage points on any number of ELRs, as per `Geofurlong.locate_batch`."""
+
+        return await self._call(self.geofurlong.locate_batch, elrs, total_yards, lon_lat)
+
+    async def between(self, elr: str, ty_from: int, ty_to: int, lon_lat: bool = False) -> Optional[shapely.geometry.LineString]:
+        """Returns a portion of the ELR geometry between two mileage points, as per `Geofurlong.between`."""
+
+        return await self._call(self.geofurlong.between, elr, ty_from, ty_to, lon_lat)
+
+    async def elr(self, elr: str) -> ELR_Attributes:
+        """Returns the attributes and centre-line geometry of the ELR, as per `Geofurlong.elr`."""
+
+        return await self._call(self.geofurlong.elr, elr)
+
+    async def traverse_array(self, elr: str, interval: int = 1760) -> np.ndarray:
+        """Returns an array of the total track yards at the specified interval within the ELR, as per `Geofurlong.traverse_array`."""
+
+        return await self._call(self.geofurlong.traverse_array, elr, interval)
+
+    async def locate_point(self, x: float, y: float, lon_lat: bool = False, max_distance: float = 100.0) -> List[ELR_Location]:
+        """Returns the candidate ELRs and mileages of a co-ordinate, as per `Geofurlong.locate_point`."""
+
+        return await self._call(self.geofurlong.locate_point, x, y, lon_lat, max_distance)
+
+    async def _call(self, function, *args):
+        """Runs a synchronous API method in the executor, once within the limit of requests in progress."""
+
+        import asyncio
+
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _run_batch(self, lon_lat: bool):
+        """Starts running the waiting `at` requests as a single batch, if any."""
+
+        import asyncio
+
+        if self._batch_timers[lon_lat] is not None:
+            self._batch_timers[lon_lat].cancel()
+            self._batch_timers[lon_lat] = None
+
+        batch, self._batches[lon_lat] = self._batches[lon_lat], []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._batch_task(batch, lon_lat))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _batch_task(self, batch: List[tuple], lon_lat: bool):
+        """Runs a batch of `at` requests in the executor, setting the result (or exception) of each request's future."""
+
+        import asyncio
+
+        elrs = [elr for elr, _, _ in batch]
+        total_yards = [ty for _, ty, _ in batch]
+        futures = [future for _, _, future in batch]
+
+        try:
+            points, errors = await asyncio.get_running_loop().run_in_executor(self._executor, self._locate, elrs, total_yards, lon_lat)
+        except Exception as e:
+            points, errors = [None] * len(batch), [e] * len(batch)
+
+        for future, point, error in zip(futures, points, errors):
+            if future.done():
+                # Request was cancelled.
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(point)
+
+    def _locate(self, elrs: List[str], total_yards: List[int], lon_lat: bool) -> Tuple[np.ndarray, list]:
+        """
+        Locates a batch of mileage points in a single `locate_batch` call, returning their points and per-point exceptions (or None).
+        Points which cannot be located are retried individually with `at`, so their exceptions are as raised by `Geofurlong.at`.
+        """
+
+        coords, status = self.geofurlong.locate_batch(np.array(elrs), np.array(total_yards), lon_lat)
+        points = shapely.points(coords)
+        errors = [None] * len(elrs)
+
+        for row in np.flatnonzero(status != Geofurlong.STATUS_OK):
+            try:
+                points[row] = self.geofurlong.at(elrs[row], total_yards[row], lon_lat)
+            except (ValueError, TypeError) as e:
+                errors[row] = e
+
+        return points, errors
+
+
+class _HTTP_Server:
+    """
+    Minimal HTTP/1.1 server of JSON geocoding endpoints, over a shared asynchronous API.
+    Connections are kept alive between requests, and concurrent `/at` requests are coalesced into batches by the API.
+    """
+
+    # Default limit of the size of a request body, larger requests being refused with status 413.
+    MAX_BODY_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, gf: AsyncGeofurlong, max_body_bytes: int = MAX_BODY_BYTES):
+        # Asynchronous API serving all requests.
+        self.geofurlong = gf
+
+        # Limit of the size of a request body, in bytes.
+        self.max_body_bytes = max_body_bytes
+
+        # Handler of each endpoint, by path.
+        self._endpoints = {
+            "/at": self._at,
+            "/between": self._between,
+            "/traverse": self._traverse,
+            "/batch": self._batch,
+            "/health": self._health,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> "asyncio.Server":
+        """Starts serving on the given host and port (or any free port, if zero), returning the asyncio server."""
+
+        import asyncio
+
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def _connection(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter"):
+        """Serves the requests of a connection, until closed by the client or a request without keep-alive."""
+
+        import asyncio
+
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+
+                    headers = {}
+                    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # A line of the request head exceeds the stream buffer limit, so the rest of the request cannot be read.
+                    self._write(writer, 431, {"error": "Request header fields too large"}, False)
+                    await writer.drain()
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    content_length = int(headers.get("content-length", 0))
+                    if content_length < 0:
+                        raise ValueError("Negative content length")
+
+                    if "transfer-encoding" in headers:
+                        # Only bodies delimited by Content-Length are supported, so the connection is closed after the response.
+                        status, payload, keep_alive = 501, {"error": "Transfer-Encoding is not supported"}, False
+                    elif content_length > self.max_body_bytes:
+                        # The body is not read, so the connection is closed after the response.
+                        status, payload, keep_alive = 413, {"error": f"Request body exceeds {self.max_body_bytes} bytes"}, False
+                    else:
+                        body = await reader.readexactly(content_length)
+                        status, payload = await self._respond(method, target, body)
+                        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                except ValueError:
+                    status, payload, keep_alive = 400, {"error": "Malformed request"}, False
+
+                self._write(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer: "asyncio.StreamWriter", status: int, payload: dict, keep_alive: bool):
+        """Writes a JSON response."""
+
+        from http import HTTPStatus
+
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _respond(self, method: str, target: str, body: bytes) -> Tuple[int, dict]:
+        """
+        Returns the status code and JSON payload of a request, reporting invalid requests with a 4xx status,
+        and any other failure of the handler with status 500.
+        """
+
+        from urllib.parse import urlsplit, parse_qs
+
+        url = urlsplit(target)
+        endpoint = self._endpoints.get(url.path)
+        if endpoint is None:
+            return 404, {"error": f"Unknown endpoint: {url.path}"}
+
+        if method != ("POST" if endpoint == self._batch else "GET"):
+            return 405, {"error": f"Method not allowed: {method}"}
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            return 200, await endpoint(params, body)
+        except (ValueError, TypeError, KeyError) as e:
+            return 400, {"error": str(e) if not isinstance(e, KeyError) else f"Missing parameter: {e.args[0]}"}
+        except Exception as e:
+            return 500, {"error": f"Internal error: {type(e).__name__}"}
+
+    @staticmethod
+    def _int(params: dict, name: str) -> int:
+        """Returns an integer query parameter."""
+
+        try:
+            return int(params[name])
+        except ValueError:
+            raise ValueError(f"Parameter {name} must be an integer") from None
+
+    @staticmethod
+    def _lon_lat(params: dict) -> bool:
+        """Returns whether Geographic co-ordinates are requested."""
+
+        return params.get("lon_lat", "false").lower() in ("1", "true", "yes")
+
+    async def _at(self, params: dict, body: bytes) -> dict:
+        """`GET /at?elr=&ty=[&lon_lat=]` - co-ordinates of a mileage point."""
+
+        elr, ty = params["elr"], _HTTP_Server._int(params, "ty")
+        point = await self.geofurlong.at(elr, ty, _HTTP_Server._lon_lat(params))
+        return {"elr": elr, "ty": ty, "x": point.x, "y": point.y}
+
+    async def _between(self, params: dict, body: bytes) -> dict:
+        """`GET /between?elr=&from=&to=[&lon_lat=]` - GeoJSON geometry of the ELR between two mileage points."""
+
+        elr, ty_from, ty_to = params["elr"], _HTTP_Server._int(params, "from"), _HTTP_Server._int(params, "to")
+        line = await self.geofurlong.between(elr, ty_from, ty_to, _HTTP_Server._lon_lat(params))
+        return {"elr": elr, "from": ty_from, "to": ty_to, "geometry": json.loads(shapely.to_geojson(line)) if line is not None else None}
+
+    async def _traverse(self, params: dict, body: bytes) -> dict:
+        """`GET /traverse?elr=[&interval=][&lon_lat=]` - co-ordinates of points at a regular interval within the ELR."""
+
+        elr = params["elr"]
+        interval = _HTTP_Server._int(params, "interval") if "interval" in params else Geofurlong.YARDS_IN_MILE
+        total_yards = await self.geofurlong.traverse_array(elr, interval)
+        coords = await self.geofurlong.at_many(elr, total_yards, _HTTP_Server._lon_lat(params))
+        return {"elr": elr, "ty": total_yards.tolist(), "coordinates": coords.tolist()}
+
+    async def _batch(self, params: dict, body: bytes) -> dict:
+        """
+        `POST /batch` of a JSON object `{"elrs": [...], "ty": [...], "lon_lat": false}` - co-ordinates of mileage points on any number of ELRs.
+        Rows which cannot be located have null co-ordinates and a non-zero status, as per `Geofurlong.locate_batch`.
+        """
+
+        request = json.loads(body)
+        elrs = np.array(request["elrs"], dtype=str)
+        total_yards = np.array(request["ty"], dtype=np.int64)
+        coords, status = await self.geofurlong.locate_batch(elrs, total_yards, bool(request.get("lon_lat", False)))
+        located = status == Geofurlong.STATUS_OK
+        return {
+            "coordinates": [xy if ok else None for xy, ok in zip(coords.tolist(), located.tolist())],
+            "status": status.tolist(),
+        }
+
+    async def _health(self, params: dict, body: bytes) -> dict:
+        """`GET /health` - versions of the API and database."""
+
+        return {"api_version": Geofurlong.API_VERSION, "db_version": self.geofurlong.geofurlong.db_version}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line interface, run by `python -m geofurlong`."""
+
+    import argparse
+    import asyncio
+    import sys
+
+    parser = argparse.ArgumentParser(prog="geofurlong", description="GeoFurlong railway geocoding.")
+    parser.add_argument("--db", default="geofurlong.sqlite", help="SQLite database (default: %(default)s)")
+    parser.add_argument("--snapshot", help="snapshot directory written by write_snapshot, used in place of the database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve geocoding over HTTP")
+    serve.add_argument("--host", default="127.0.0.1", help="host to listen on (default: %(default)s)")
+    serve.add_argument("--port", type=int, default=8080, help="port to listen on (default: %(default)s)")
+    serve.add_argument("--workers", type=int, default=4, help="threads running lookups (default: %(default)s)")
+    serve.add_argument("--max-pending", type=int, default=10_000, help="requests in progress before backpressure (default: %(default)s)")
+
+    geocode = commands.add_parser("geocode", help="append co-ordinates to a CSV file of ELRs and mileages")
+    geocode.add_argument("in_csv", help="input CSV file, with a header row")
+    geocode.add_argument("out_csv", help="output CSV file, with x, y, and status columns appended")
+    geocode.add_argument("--elr-column", default="elr", help="column of ELR codes (default: %(default)s)")
+    geocode.add_argument("--mileage-column", default="mileage", help="column of decimal mileages, of form mmm.yyyy (default: %(default)s)")
+    geocode.add_argument("--total-yards-column", help="column of total yards, used in place of the mileage column")
+    geocode.add_argument("--lon-lat", action="store_true", help="write Geographic co-ordinates, rather than Planar")
+    geocode.add_argument("--chunk-size", type=int, default=100_000, help="rows read and located at a time (default: %(default)s)")
+
+    export = commands.add_parser("export", help="export points at regular intervals within every ELR, resuming any interrupted export")
+    export.add_argument("output_dir", help="directory of the exported files and their manifest")
+    export.add_argument("--intervals", type=int, nargs="+", default=[1_760], help="intervals between points, in yards (default: %(default)s)")
+    export.add_argument("--format", choices=Geofurlong.EXPORT_FORMATS, default="geojson", help="output format (default: %(default)s)")
+    export.add_argument("--elrs", nargs="+", help="ELRs to export (default: all)")
+    export.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+
+    args = parser.parse_args(argv)
+    gf = ThreadSafeGeofurlong.from_snapshot(args.snapshot) if args.snapshot else ThreadSafeGeofurlong(args.db)
+
+    if args.command == "serve":
+
+        async def serve_forever():
+            async with AsyncGeofurlong(gf, max_workers=args.workers, max_pending=args.max_pending) as agf:
+                server = await _HTTP_Server(agf).start(args.host, args.port)
+                print(f"Serving database version {gf.db_version} on http://{args.host}:{args.port}", flush=True)
+                async with server:
+                    await server.serve_forever()
+
+        # Warm the cache before accepting requests.
+        gf.preload()
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == "geocode":
+        start_time = time.perf_counter()
+
+        def progress(rows: int):
+            elapsed = time.perf_counter() - start_time
+            print(f"\r{rows:,} rows  {rows / elapsed:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+        try:
+            gf.geocode_csv(
+                args.in_csv,
+                args.out_csv,
+                elr_column=args.elr_column,
+                mileage_column=args.mileage_column,
+                total_yards_column=args.total_yards_column,
+                lon_lat=args.lon_lat,
+                chunk_size=args.chunk_size,
+                progress=progress,
+            )
+        except (ValueError, TypeError, OSError) as e:
+            parser.exit(1, f"geofurlong: error: {e}\n")
+        print(file=sys.stderr)
+
+    elif args.command == "export":
+        start_time = time.perf_counter()
+
+        def progress(done: int, total: int):
+            elapsed = time.perf_counter() - start_time
+            print(f"\r{done:,} / {total:,} files  {done / elapsed:,.1f} files/s", end="", file=sys.stderr, flush=True)
+
+        try:
+            manifest = gf.export_network(args.output_dir, args.intervals, args.format, args.elrs, args.processes, progress)
+        except (ValueError, TypeError, OSError) as e:
+            parser.exit(1, f"geofurlong: error: {e}\n")
+        print(f"\n{len(manifest['outputs']):,} files exported, {len(manifest['failures']):,} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,22 @@
 # GeoFurlong unit tests.
 
+import asyncio
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 import numpy as np
+import shapely
 from shapely.geometry import LineString, Point
-from geofurlong import Geofurlong, ELR_Attributes
+from shapely.ops import substring
+import geofurlong
+from geofurlong import Geofurlong, ThreadSafeGeofurlong, AsyncGeofurlong, GeoJSON_Writer, GeoParquet_Writer, ELR_Attributes, ELR_Points, ELR_Location, ELR_Locations, ELR_Range, _ELR_Line, _Calibration_Store, _ELR_Spatial_Index, _Snapshot, _HTTP_Server
 
 
 @pytest.mark.parametrize(
@@ -236,7 +248,8 @@ def test_linear_offset():
         ],
     )
 
-    gf._elr_attrs = ELR_Attributes(calibration=calibration)
+    gf._elr_attrs = ELR_Attributes()
+    Geofurlong._set_calibration(gf._elr_attrs, calibration)
 
     assert gf._linear_offset(0) == 50.0
     assert gf._linear_offset(500) == 65.0
@@ -250,6 +263,59 @@ def test_linear_offset():
     with pytest.raises(ValueError):
         gf._linear_offset(99_999)
 
+    gf._elr_attrs = ELR_Attributes()
+    Geofurlong._set_calibration(gf._elr_attrs, calibration[:1])
+    assert gf._linear_offset(500) == 65.0
+    with pytest.raises(ValueError):
+        gf._linear_offset(6_000)
+
+
+def test_elr_line():
+    calibration = np.array(
+        [(0, 1_000, 50.0, 80.0), (1_000, 1_000, 80.0, 80.0), (2_000, 3_000, 100.0, 90.0)],
+        dtype=Geofurlong._CALIBRATION_DTYPE,
+    )
+    line = _ELR_Line.build(calibration)
+
+    assert line.ty_from == (0, 1_000, 2_000) and isinstance(line.lo_from[0], float)
+    np.testing.assert_allclose(
+        [line.linear_offset(ty) for ty in (0, 500, 1_000, 2_500, 3_000)],
+        [50.0, 65.0, 80.0, 95.0, 90.0],
+    )
+    assert line.linear_offset(-1) is None and line.linear_offset(1_500) is None and line.linear_offset(3_001) is None
+
+    # Slotted and immutable.
+    with pytest.raises(AttributeError):
+        line.ty_from = ()
+    assert not hasattr(line, "__dict__")
+
+
+def test_at_no_attribute_copies(geofurlong_instance):
+    elr = geofurlong_instance.elr_codes[0]
+    ty = geofurlong_instance.elr(elr).ty_from
+
+    with patch("geofurlong.Geofurlong.properties", new_callable=PropertyMock) as mock_properties:
+        point = geofurlong_instance.at(elr, ty)
+        mock_properties.assert_not_called()
+
+    np.testing.assert_allclose([(point.x, point.y)], geofurlong_instance.at_many(elr, [ty]))
+
+
+def test_at_alternating_elrs(geofurlong_instance):
+    # Each ELR's line is built once, when calibrated, rather than whenever the current ELR changes.
+    elrs = ["LNG", "TST"]
+    points = {elr: geofurlong_instance.elr(elr).ty_to for elr in elrs}
+
+    with patch("geofurlong._ELR_Line.build", wraps=_ELR_Line.build) as build:
+        for _ in range(5):
+            for elr in elrs:
+                geofurlong_instance.at(elr, points[elr])
+        assert build.call_count == len(elrs)
+
+    for elr in elrs:
+        attrs = geofurlong_instance._elr_cache[elr]
+        assert attrs.line.ty_from == tuple(attrs.calibration["ty_from"].tolist())
+
 
 @pytest.fixture
 def mock_geofurlong():
@@ -289,8 +355,7 @@ def geofurlong_instance():
 def test_at(mock_linear_offset, mock_validate_elr_mileage, geofurlong_instance):
     test_linestring = LineString([(100, 500), (400, 900)])
 
-    geofurlong_instance._elr_attrs = MagicMock()
-    geofurlong_instance._elr_attrs.geometry = test_linestring
+    geofurlong_instance._elr_attrs = ELR_Attributes(geometry=test_linestring)
 
     point_geometry = geofurlong_instance.at("TEST", 0)
     assert isinstance(point_geometry, Point)
@@ -304,8 +369,7 @@ def test_between(mock_linear_offset, mock_validate_elr_mileage, geofurlong_insta
 
     mock_linear_offset.side_effect = [100, 500]
 
-    geofurlong_instance._elr_attrs = MagicMock()
-    geofurlong_instance._elr_attrs.geometry = test_linestring
+    geofurlong_instance._elr_attrs = ELR_Attributes(geometry=test_linestring)
 
     linestring_geometry = geofurlong_instance.between("TEST", 0, 1000, lon_lat=False)
     assert isinstance(linestring_geometry, LineString)
@@ -328,3 +392,1138 @@ def test_traverse(geofurlong_instance):
     generated_yards = list(geofurlong_instance.traverse(elr, interval))
 
     assert generated_yards == expected_yards
+
+
+@pytest.fixture
+def calibrated_geofurlong():
+    gf = Geofurlong()
+    gf.elr = MagicMock(return_value=None)
+    gf._elr_attrs = ELR_Attributes(
+        elr="TEST",
+        ty_from=0,
+        ty_to=11_000,
+        geometry=LineString([(100, 500), (400, 900)]),
+    )
+    gf._elr_attrs.vertices, gf._elr_attrs.cumulative = Geofurlong._line_arrays(gf._elr_attrs.geometry)
+    Geofurlong._set_calibration(
+        gf._elr_attrs,
+        np.array(
+            [(0, 1_000, 50.0, 80.0), (1_000, 5_000, 80.0, 180.0), (6_000, 11_000, 180.0, 480.0)],
+            dtype=[
+                ("ty_from", np.int32),
+                ("ty_to", np.int32),
+                ("lo_from", np.float32),
+                ("lo_to", np.float32),
+            ],
+        ),
+    )
+    gf._elr_cache["TEST"] = gf._elr_attrs
+    gf.elr.return_value = gf._elr_attrs
+    gf._calibration_store = _Calibration_Store.build(["TEST"], [0], [11_000], ["TEST"] * 3, gf._elr_attrs.calibration)
+    return gf
+
+
+def test_linear_offsets(calibrated_geofurlong):
+    total_yards = np.array([0, 500, 1_000, 5_000, 5_500, 11_000, -1, 11_001])
+    linear_offsets, _ = Geofurlong._resolve(calibrated_geofurlong._elr_attrs, total_yards)
+    np.testing.assert_allclose(linear_offsets[:4], [50.0, 65.0, 80.0, 180.0])
+    assert np.isnan(linear_offsets[4])
+    assert linear_offsets[5] == 480.0
+    assert np.isnan(linear_offsets[6:]).all()
+
+    # The offsets of a single ELR match those of the network-wide calibration store.
+    store = calibrated_geofurlong._calibrations()
+    np.testing.assert_array_equal(store.linear_offsets(np.zeros(len(total_yards), dtype=int), total_yards), linear_offsets)
+
+
+def test_at_many(calibrated_geofurlong):
+    coords = calibrated_geofurlong.at_many("TEST", np.array([0, 1_000, 11_000]))
+    assert coords.shape == (3, 2) and coords.dtype == np.float64
+    np.testing.assert_allclose(coords, [(130, 540), (148, 564), (388, 884)])
+
+    for ty in (0, 1_000, 11_000):
+        point = calibrated_geofurlong.at("TEST", ty)
+        np.testing.assert_allclose(calibrated_geofurlong.at_many("TEST", [ty])[0], (point.x, point.y))
+
+    point = calibrated_geofurlong.at("TEST", 1_000, lon_lat=True)
+    np.testing.assert_allclose(calibrated_geofurlong.at_many("TEST", [1_000], lon_lat=True)[0], (point.x, point.y))
+
+    assert calibrated_geofurlong.at_many("TEST", np.array([], dtype=np.int32)).shape == (0, 2)
+
+
+def test_at_many_invalid(calibrated_geofurlong):
+    with pytest.raises(ValueError, match="outwith valid bounds"):
+        calibrated_geofurlong.at_many("TEST", np.array([0, 11_001]))
+
+    with pytest.raises(ValueError, match="No calibration data"):
+        calibrated_geofurlong.at_many("TEST", np.array([0, 5_500]))
+
+    # Fractional and NaN mileages are reported from their status, rather than being truncated to whole yards.
+    with pytest.raises(ValueError, match="No calibration data"):
+        calibrated_geofurlong.at_many("TEST", np.array([0, 5_500.5]))
+
+    with pytest.raises(ValueError, match=r"\[11000.5\] on ELR TEST outwith valid bounds"):
+        calibrated_geofurlong.at_many("TEST", np.array([11_000.5]))
+
+    with pytest.raises(ValueError, match="not a finite number"):
+        calibrated_geofurlong.at_many("TEST", np.array([0, np.nan]))
+
+
+def test_locate_batch(calibrated_geofurlong):
+    elrs = np.array(["TEST", "abc", "TEST", "ZZZ9", "TEST", "TEST"])
+    total_yards = np.array([11_000, 0, 0, 0, 5_500, 11_001])
+
+    coords, status = calibrated_geofurlong.locate_batch(elrs, total_yards)
+
+    assert coords.shape == (6, 2)
+    np.testing.assert_array_equal(
+        status,
+        [
+            Geofurlong.STATUS_OK,
+            Geofurlong.STATUS_INVALID_ELR,
+            Geofurlong.STATUS_OK,
+            Geofurlong.STATUS_UNKNOWN_ELR,
+            Geofurlong.STATUS_NO_CALIBRATION,
+            Geofurlong.STATUS_OUTWITH_BOUNDS,
+        ],
+    )
+    np.testing.assert_allclose(coords[[0, 2]], [(388, 884), (130, 540)])
+    assert np.isnan(coords[[1, 3, 4, 5]]).all()
+
+    geographic, _ = calibrated_geofurlong.locate_batch(elrs, total_yards, lon_lat=True)
+    np.testing.assert_allclose(geographic[[0, 2]], calibrated_geofurlong.at_many("TEST", [11_000, 0], lon_lat=True))
+    assert np.isnan(geographic[[1, 3, 4, 5]]).all()
+
+    with pytest.raises(ValueError):
+        calibrated_geofurlong.locate_batch(elrs, total_yards[:-1])
+
+    # A known ELR without any calibration data is distinguished from an unknown ELR.
+    calibration = calibrated_geofurlong._elr_attrs.calibration
+    calibrated_geofurlong._calibration_store = _Calibration_Store.build(["NONE", "TEST"], [0, 0], [500, 11_000], ["TEST"] * 3, calibration)
+    _, status = calibrated_geofurlong.locate_batch(np.array(["NONE", "ZZZ9", "TEST"]), np.array([100, 100, 100]))
+    np.testing.assert_array_equal(status, [Geofurlong.STATUS_NO_CALIBRATION, Geofurlong.STATUS_UNKNOWN_ELR, Geofurlong.STATUS_OK])
+
+
+def test_calibration_store():
+    calibration_a = np.array([(0, 1_000, 50.0, 80.0), (1_000, 5_000, 80.0, 180.0)], dtype=Geofurlong._CALIBRATION_DTYPE)
+    calibration_c = np.array([(-500, 0, 0.0, 10.0), (6_000, 11_000, 180.0, 480.0)], dtype=Geofurlong._CALIBRATION_DTYPE)
+    store = _Calibration_Store.build(
+        ["AAA", "BBB", "CCC"],
+        [0, 0, -500],
+        [5_000, 100, 11_000],
+        ["CCC", "AAA", "ZZZ", "CCC", "AAA"],
+        np.concatenate((calibration_c[1:], calibration_a[:1], calibration_a[:1], calibration_c[:1], calibration_a[1:])),
+    )
+
+    np.testing.assert_array_equal(store.offsets, [0, 2, 2, 4])
+    np.testing.assert_array_equal(store.elr_index(["CCC", "BBB", "ZZZ", "abc", "AAA"]), [2, 1, -1, -1, 0])
+    np.testing.assert_array_equal(store.calibrated(np.array([0, 1, 2, -1])), [True, False, True, False])
+    assert store.calibration(2).dtype == calibration_c.dtype
+    np.testing.assert_array_equal(store.calibration(2), calibration_c)
+    assert store.nbytes > 0
+
+    # Lookups on many ELRs at once match those on each ELR in turn.
+    total_yards = np.array([-600, -500, 0, 500, 5_000, 5_500, 11_000, 11_001, 99_999])
+    linear_offsets = np.array([-1, 0, 5, 49.95, 65, 180, 200, 480.05, 481])
+    nan = np.nan
+    expected = (
+        (0, [nan, nan, 50.0, 65.0, 180.0, nan, nan, nan, nan], [nan, nan, nan, 0.0, 500.0, 5_000.0, nan, nan, nan]),
+        (2, [nan, 0.0, 10.0, nan, nan, nan, 480.0, nan, nan], [nan, -500.0, -250.0, nan, nan, 6_000.0, 6_000.0 + 1_000.0 / 3, 11_000.0, nan]),
+    )
+    for elr_index, expected_offsets, expected_total_yards in expected:
+        elr_indices = np.full(len(total_yards), elr_index)
+        np.testing.assert_array_equal(store.linear_offsets(elr_indices, total_yards), expected_offsets)
+        np.testing.assert_allclose(store.total_yards_at(elr_indices, linear_offsets), expected_total_yards)
+
+    assert np.isnan(store.linear_offsets(np.array([1, -1]), [50, 50])).all()
+    assert np.isnan(store.total_yards_at(np.array([1, -1]), [50, 50])).all()
+
+
+def test_calibration_store_decreasing():
+    # Linear offsets decrease along the last row, as allowed by the forward lookup.
+    calibration = np.array(
+        [(0, 1_000, 50.0, 80.0), (1_000, 1_000, 80.0, 80.0), (2_000, 3_000, 100.0, 90.0)],
+        dtype=Geofurlong._CALIBRATION_DTYPE,
+    )
+    store = _Calibration_Store.build(["AAA"], [0], [3_000], ["AAA"] * 3, calibration)
+
+    total_yards = np.array([0, 500, 2_000, 2_250, 2_500, 3_000])
+    elr_index = np.zeros(len(total_yards), dtype=int)
+    linear_offsets = store.linear_offsets(elr_index, total_yards)
+    np.testing.assert_allclose(linear_offsets, [50.0, 65.0, 100.0, 97.5, 95.0, 90.0])
+    np.testing.assert_allclose(store.total_yards_at(elr_index, linear_offsets), total_yards)
+
+    assert np.isnan(store.total_yards_at(elr_index[:3], [85.0, 89.0, 101.0])).all()
+
+
+def test_calibration_store_database(geofurlong_instance):
+    store = geofurlong_instance._calibrations()
+    assert store is geofurlong_instance._calibrations()
+    assert tuple(store.elr_codes) == geofurlong_instance.elr_codes
+
+    for elr_index, elr in enumerate(geofurlong_instance.elr_codes):
+        attrs = geofurlong_instance._load_elr(elr)
+        assert (store.elr_ty_from[elr_index], store.elr_ty_to[elr_index]) == (attrs.ty_from, attrs.ty_to)
+
+        if store.calibrated(np.array([elr_index]))[0]:
+            np.testing.assert_array_equal(geofurlong_instance._calibrate(attrs).calibration, store.calibration(elr_index))
+        else:
+            with pytest.raises(ValueError, match="No calibration data"):
+                geofurlong_instance._calibrate(attrs)
+
+
+def test_substrings():
+    line = LineString([(0, 0), (10, 0), (10, 10), (20, 10), (20, 20)])
+    vertices, cumulative = Geofurlong._line_arrays(line)
+    np.testing.assert_allclose(cumulative, [0, 10, 20, 30, 40])
+
+    lo_from = np.array([0, 5, 10, 35, 15, 12])
+    lo_to = np.array([40, 25, 20, 5, 15, 99])
+    coords, counts = Geofurlong._substrings(vertices, cumulative, lo_from, lo_to)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    for i, (start, end) in enumerate(zip(lo_from, lo_to)):
+        expected = substring(line, start, end)
+        if isinstance(expected, Point):
+            expected = LineString([expected, expected])
+        assert LineString(coords[offsets[i] : offsets[i + 1]]).equals_exact(expected, 1e-9)
+
+
+def test_between_many(calibrated_geofurlong):
+    elrs = np.array(["TEST", "abc", "TEST", "TEST"])
+    ty_from = np.array([0, 0, 11_000, 0])
+    ty_to = np.array([1_000, 1_000, 1_000, 5_500])
+
+    geometries, status = calibrated_geofurlong.between_many(elrs, ty_from, ty_to)
+
+    np.testing.assert_array_equal(
+        status, [Geofurlong.STATUS_OK, Geofurlong.STATUS_INVALID_ELR, Geofurlong.STATUS_OK, Geofurlong.STATUS_NO_CALIBRATION]
+    )
+    assert geometries[1] is None and geometries[3] is None
+    assert geometries[0].equals(LineString([(130, 540), (148, 564)]))
+    assert geometries[2].equals(calibrated_geofurlong.between("TEST", 1_000, 11_000))
+
+    coords, offsets, status = calibrated_geofurlong.between_many(elrs, ty_from, ty_to, lon_lat=True, ragged=True)
+    np.testing.assert_array_equal(offsets, [0, 2, 2, 4, 4])
+    np.testing.assert_allclose(coords[:2], calibrated_geofurlong.at_many("TEST", [0, 1_000], lon_lat=True))
+
+
+@pytest.mark.parametrize("vertex_arrays", [True, False])
+def test_between_many_matches_between(calibrated_geofurlong, vertex_arrays):
+    gf = calibrated_geofurlong
+    if not vertex_arrays:
+        # Geometries other than a LineString have no vertex arrays, leaving both methods to fall back to GEOS.
+        gf._elr_attrs.vertices, gf._elr_attrs.cumulative = None, None
+
+    pairs = [(0, 1_000), (500, 500), (11_000, 0), (1_000, 1_000), (4_000, 800), (6_000, 11_000), (11_000, 11_000)]
+    ty_from, ty_to = np.array(pairs).T
+
+    for lon_lat in (False, True):
+        geometries, status = gf.between_many(np.full(len(pairs), "TEST"), ty_from, ty_to, lon_lat=lon_lat)
+        np.testing.assert_array_equal(status, Geofurlong.STATUS_OK)
+        for geometry, (start, end) in zip(geometries, pairs):
+            expected = gf.between("TEST", start, end, lon_lat=lon_lat)
+            assert geometry.geom_type == expected.geom_type
+            assert geometry.equals_exact(expected, 1e-9)
+
+
+def test_lazy_imports():
+    # Importing the module and constructing the API must not import pyproj, nor build a transformer.
+    script = (
+        "import sys\n"
+        "from geofurlong import Geofurlong\n"
+        "gf = Geofurlong()\n"
+        "gf.elr(gf.elr_codes[0])\n"
+        "assert 'pyproj' not in sys.modules and 'shapely.ops' not in sys.modules\n"
+        "assert gf._lon_lat_transformer is None and gf._planar_transformer is None\n"
+        "gf._transformer\n"
+        "assert 'pyproj' in sys.modules and gf._lon_lat_transformer is not None\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(geofurlong.__file__))
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_to_lon_lat(geofurlong_instance):
+    coords = np.array([(530_034.0, 180_381.0), (325_893.0, 673_528.0)])
+    expected = [geofurlong_instance._transformer.transform(x, y) for x, y in coords]
+    np.testing.assert_allclose(geofurlong_instance._to_lon_lat(coords), expected)
+
+    line = geofurlong_instance._to_lon_lat_geometry(LineString(coords))
+    assert isinstance(line, LineString)
+    np.testing.assert_allclose(line.coords, expected)
+
+    point = geofurlong_instance._to_lon_lat_geometry(Point(coords[0]))
+    assert isinstance(point, Point)
+    np.testing.assert_allclose((point.x, point.y), expected[0])
+
+
+def test_interpolate():
+    line = LineString([(0, 0), (10, 0), (10, 0), (10, 10), (20, 10)])
+    attrs = ELR_Attributes(geometry=line)
+    vertices_attrs = ELR_Attributes(geometry=line)
+    vertices_attrs.vertices, vertices_attrs.cumulative = Geofurlong._line_arrays(line)
+
+    linear_offsets = np.array([0, 2.5, 10, 15, 20, 29.5, 30, 99])
+    expected = [(p.x, p.y) for p in (line.interpolate(lo) for lo in linear_offsets)]
+
+    np.testing.assert_allclose(Geofurlong._interpolate(attrs, linear_offsets), expected)
+    np.testing.assert_allclose(Geofurlong._interpolate(vertices_attrs, linear_offsets), expected)
+
+    for lo, point in zip(linear_offsets, expected):
+        np.testing.assert_allclose(Geofurlong._interpolate_point(attrs, lo), point)
+        np.testing.assert_allclose(Geofurlong._interpolate_point(vertices_attrs, lo), point)
+
+
+@pytest.mark.parametrize(
+    "ty_from, ty_to, interval, expected",
+    [
+        (-123, 1501, 500, [-123, 0, 500, 1000, 1500, 1501]),
+        (0, 1500, 500, [0, 500, 1000, 1500]),
+        (-1000, -1, 500, [-1000, -500, -1]),
+        (10, 20, 1760, [10, 20]),
+        (10, 10, 1760, [10]),
+        (0, 5, 1, [0, 1, 2, 3, 4, 5]),
+    ],
+)
+def test_traverse_arithmetic(geofurlong_instance, ty_from, ty_to, interval, expected):
+    mock_elr_attrs = MagicMock()
+    mock_elr_attrs.ty_from = ty_from
+    mock_elr_attrs.ty_to = ty_to
+    geofurlong_instance.elr = MagicMock(return_value=mock_elr_attrs)
+
+    brute_force = [i for i in range(ty_from, ty_to + 1) if i == ty_from or i == ty_to or i % interval == 0]
+    assert list(geofurlong_instance.traverse("TEST", interval)) == expected == brute_force
+
+    traverse_array = geofurlong_instance.traverse_array("TEST", interval)
+    assert traverse_array.dtype == np.int32
+    assert traverse_array.tolist() == expected
+
+
+def test_traverse_array_invalid_interval(geofurlong_instance):
+    with pytest.raises(TypeError):
+        geofurlong_instance.traverse_array("TEST", 0)
+
+    with pytest.raises(TypeError):
+        geofurlong_instance.traverse_array("TEST", "a")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5, 100])
+def test_traverse_points(calibrated_geofurlong, chunk_size):
+    calibrated_geofurlong._elr_attrs.ty_to = 5_000
+    expected_yards = calibrated_geofurlong.traverse_array("TEST", 1_000)
+
+    chunks = list(calibrated_geofurlong.traverse_points("TEST", 1_000, chunk_size=chunk_size))
+
+    assert all(isinstance(chunk, ELR_Points) and len(chunk.total_yards) <= chunk_size for chunk in chunks)
+    np.testing.assert_array_equal(np.concatenate([chunk.total_yards for chunk in chunks]), expected_yards)
+
+    easting_northing = np.column_stack(
+        (np.concatenate([chunk.easting for chunk in chunks]), np.concatenate([chunk.northing for chunk in chunks]))
+    )
+    np.testing.assert_allclose(easting_northing, calibrated_geofurlong.at_many("TEST", expected_yards))
+
+    lon_lat = np.column_stack(
+        (np.concatenate([chunk.longitude for chunk in chunks]), np.concatenate([chunk.latitude for chunk in chunks]))
+    )
+    np.testing.assert_allclose(lon_lat, calibrated_geofurlong.at_many("TEST", expected_yards, lon_lat=True))
+
+
+def test_traverse_points_uncalibrated(calibrated_geofurlong):
+    with pytest.raises(ValueError, match="No calibration data"):
+        list(calibrated_geofurlong.traverse_points("TEST", 500))
+
+
+def test_total_yards_at(calibrated_geofurlong):
+    store = calibrated_geofurlong._calibrations()
+    total_yards = np.array([0, 500, 1_000, 4_000, 6_000, 11_000])
+    elr_index = np.zeros(len(total_yards), dtype=int)
+
+    np.testing.assert_allclose(store.total_yards_at(elr_index, store.linear_offsets(elr_index, total_yards)), total_yards)
+    np.testing.assert_allclose(store.total_yards_at(elr_index[:2], [49.95, 480.05]), [0, 11_000])
+    assert np.isnan(store.total_yards_at(elr_index[:3], [0, 49, 481])).all()
+
+
+def test_project():
+    line = LineString([(i * 10, (i % 3) * 5) for i in range(100)])
+    index = _ELR_Spatial_Index.build(("TEST",), np.array([line]))
+    assert len(index.piece_elr) == 4
+    assert index.piece_end[-1] == 99
+
+    points = np.array([(12, 20), (500, -7), (985, 3), (-5, -5)])
+    pieces = index.tree.query_nearest(shapely.points(points), all_matches=False)[1]
+    distances, linear_offsets = Geofurlong._project(index, pieces, points)
+
+    np.testing.assert_allclose(distances, shapely.distance(line, shapely.points(points)))
+    np.testing.assert_allclose(linear_offsets, shapely.line_locate_point(line, shapely.points(points)))
+
+
+def test_locate_point(calibrated_geofurlong):
+    calibrated_geofurlong._spatial_index = _ELR_Spatial_Index.build(("TEST",), np.array([calibrated_geofurlong._elr_attrs.geometry]))
+
+    # 10 metres perpendicular to the centre-line at 1,000 total yards.
+    assert calibrated_geofurlong.locate_point(140, 570) == [ELR_Location(elr="TEST", total_yards=1_000, distance=pytest.approx(10))]
+    assert calibrated_geofurlong.locate_point(140, 570, max_distance=5) == []
+
+    # No calibration data beyond 480 metres along the centre-line.
+    assert calibrated_geofurlong.locate_point(397, 896)[0].total_yards is None
+
+    geographic = calibrated_geofurlong.at("TEST", 11_000, lon_lat=True)
+    planar = calibrated_geofurlong._to_planar(np.array([(geographic.x, geographic.y)]))[0]
+    assert calibrated_geofurlong.locate_point(geographic.x, geographic.y, lon_lat=True) == calibrated_geofurlong.locate_point(*planar)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_locate_points(calibrated_geofurlong, chunk_size):
+    calibrated_geofurlong._spatial_index = _ELR_Spatial_Index.build(("TEST",), np.array([calibrated_geofurlong._elr_attrs.geometry]))
+
+    locations = calibrated_geofurlong.locate_points([140, 397, 1_000, 130], [570, 896, 0, 540], chunk_size=chunk_size)
+
+    assert isinstance(locations, ELR_Locations)
+    assert locations.elr.tolist() == ["TEST", "TEST", "", "TEST"]
+    np.testing.assert_allclose(locations.total_yards, [1_000, np.nan, np.nan, 0])
+    np.testing.assert_allclose(locations.distance, [10, 0, np.nan, 0], atol=1e-9)
+
+
+def test_locate_points_csv(calibrated_geofurlong, tmp_path):
+    calibrated_geofurlong._spatial_index = _ELR_Spatial_Index.build(("TEST",), np.array([calibrated_geofurlong._elr_attrs.geometry]))
+    calibrated_geofurlong._elr_attrs.metric = False
+
+    in_csv_fn = tmp_path / "in.csv"
+    out_csv_fn = tmp_path / "out.csv"
+    in_csv_fn.write_text("id,easting,northing\n1,140,570\n2,1000,0\n3,130,540\n")
+
+    assert calibrated_geofurlong.locate_points_csv(in_csv_fn, out_csv_fn, "easting", "northing", chunk_size=2) == 3
+    assert out_csv_fn.read_text().splitlines() == [
+        "id,easting,northing,elr,total_yards,mileage,distance",
+        "1,140,570,TEST,1000,0M 1000y,10.000",
+        "2,1000,0,,,,",
+        "3,130,540,TEST,0,0M 0000y,0.000",
+    ]
+
+    # Each distinct ELR is looked up once per chunk, rather than once per row.
+    in_csv_fn.write_text("id,easting,northing\n1,140,570\n\n2,130,540\n3,131,541\n")
+    hits = calibrated_geofurlong.cache_stats.hits
+    assert calibrated_geofurlong.locate_points_csv(in_csv_fn, out_csv_fn, "easting", "northing") == 3
+    assert calibrated_geofurlong.cache_stats.hits == hits + 1
+
+    in_csv_fn.write_text("id,easting,northing\n1,140\n")
+    with pytest.raises(ValueError, match="Line 2 of CSV file .* has 2 columns"):
+        calibrated_geofurlong.locate_points_csv(in_csv_fn, out_csv_fn, "easting", "northing")
+
+    with pytest.raises(ValueError, match="does not have both"):
+        calibrated_geofurlong.locate_points_csv(in_csv_fn, out_csv_fn)
+
+
+def test_geocode_csv(calibrated_geofurlong, tmp_path):
+    in_csv_fn = tmp_path / "in.csv"
+    out_csv_fn = tmp_path / "out.csv"
+    in_csv_fn.write_text("id,elr,mileage\n1,TEST,0.0000\n2,TEST,0.0500\n3,TEST,9.0000\n4,ZZZ9,0.0100\n5,TEST,x\n6,ZZZ9,x\n")
+
+    progress = []
+    assert calibrated_geofurlong.geocode_csv(in_csv_fn, out_csv_fn, chunk_size=2, progress=progress.append) == 6
+    assert progress == [2, 4, 6]
+    assert out_csv_fn.read_text().splitlines() == [
+        "id,elr,mileage,x,y,status",
+        "1,TEST,0.0000,130.000,540.000,0",
+        "2,TEST,0.0500,139.000,552.000,0",
+        "3,TEST,9.0000,,,3",
+        "4,ZZZ9,0.0100,,,2",
+        "5,TEST,x,,,5",
+        "6,ZZZ9,x,,,2",
+    ]
+
+    in_csv_fn.write_text("code,ty\nTEST,500\nTEST,500.5\nTEST,x\n")
+    calibrated_geofurlong.geocode_csv(in_csv_fn, out_csv_fn, elr_column="code", total_yards_column="ty")
+    assert out_csv_fn.read_text().splitlines() == ["code,ty,x,y,status", "TEST,500,139.000,552.000,0", "TEST,500.5,,,5", "TEST,x,,,5"]
+
+    # Blank lines are skipped, whilst a row without the mileage column is reported with its line number.
+    in_csv_fn.write_text("code,ty\n\nTEST,500\n\n")
+    assert calibrated_geofurlong.geocode_csv(in_csv_fn, out_csv_fn, elr_column="code", total_yards_column="ty") == 1
+    in_csv_fn.write_text("code,ty\nTEST,500\nTEST\n")
+    with pytest.raises(ValueError, match="Line 3 of CSV file .* has 1 columns"):
+        calibrated_geofurlong.geocode_csv(in_csv_fn, out_csv_fn, elr_column="code", total_yards_column="ty")
+
+    with pytest.raises(ValueError, match="does not have both"):
+        calibrated_geofurlong.geocode_csv(in_csv_fn, out_csv_fn)
+
+
+def test_parse_mileages():
+    values = ["0.0000", "12.0600", "-0.0123", "1.1759", "", "inf", "x"]
+    total_yards = Geofurlong._parse_mileages(values)
+    assert total_yards[:4].tolist() == [Geofurlong.miles_yards_to_total_yards(float(value)) for value in values[:4]]
+    assert np.isnan(total_yards[4:]).all()
+
+
+def test_main_geocode(geofurlong_instance, tmp_path, capsys):
+    elr = geofurlong_instance.elr_codes[-1]
+    in_csv_fn = tmp_path / "in.csv"
+    out_csv_fn = tmp_path / "out.csv"
+    in_csv_fn.write_text(f"elr,mileage\n{elr},0.0100\n")
+
+    geofurlong.main(["geocode", str(in_csv_fn), str(out_csv_fn), "--lon-lat"])
+    point = geofurlong_instance.at(elr, 100, lon_lat=True)
+    assert out_csv_fn.read_text().splitlines()[1] == f"{elr},0.0100,{point.x:.7f},{point.y:.7f},0"
+    assert "1 rows" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        geofurlong.main(["geocode", str(in_csv_fn), str(out_csv_fn), "--mileage-column", "missing"])
+
+
+def test_elrs_in_area(calibrated_geofurlong):
+    calibrated_geofurlong._spatial_index = _ELR_Spatial_Index.build(("TEST",), np.array([calibrated_geofurlong._elr_attrs.geometry]))
+
+    assert calibrated_geofurlong.elrs_in_bbox(130, 540, 148, 564) == [ELR_Range(elr="TEST", ty_from=0, ty_to=1_000)]
+    assert calibrated_geofurlong.elrs_in_bbox(0, 0, 10, 10) == []
+    assert calibrated_geofurlong.elrs_within(130, 540, 30) == [ELR_Range(elr="TEST", ty_from=None, ty_to=1_000)]
+    assert calibrated_geofurlong.elrs_within(0, 0, 10) == []
+
+
+def test_elrs_in_area_multiple_ranges(geofurlong_instance):
+    # A centre-line of 100 segments, which leaves and re-enters the bounding box.
+    line = LineString([(x, 0) for x in range(0, 51)] + [(50, y) for y in range(1, 11)] + [(x, 10) for x in range(49, 10, -1)])
+    geofurlong_instance._spatial_index = _ELR_Spatial_Index.build(("LOOP",), np.array([line]))
+    geofurlong_instance._calibration_store = _Calibration_Store.build(
+        ["LOOP"], [0], [110], ["LOOP"], np.array([(0, 110, 0.0, 100.0)], dtype=Geofurlong._CALIBRATION_DTYPE)
+    )
+
+    assert geofurlong_instance.elrs_in_bbox(5, -1, 45, 11) == [
+        ELR_Range(elr="LOOP", ty_from=6, ty_to=50),
+        ELR_Range(elr="LOOP", ty_from=72, ty_to=109),
+    ]
+
+
+def test_elrs_in_area_index_built_once():
+    minx, miny, maxx, maxy = shapely.bounds(Geofurlong().elr(Geofurlong().elr_codes[-1]).geometry)
+    area = (minx, miny, (minx + maxx) / 2, (miny + maxy) / 2)
+
+    # The spatial index of all ELRs is built on the first query, and shared by the later ones, without using the ELR cache.
+    gf = Geofurlong()
+    ranges = gf.elrs_in_bbox(*area)
+    index = gf._spatial_index
+    assert index is not None and ranges and ranges[-1].elr == gf.elr_codes[-1]
+
+    with patch("geofurlong._ELR_Spatial_Index.build") as build:
+        assert gf.elrs_in_bbox(*area) == ranges
+        gf.elrs_within(minx, miny, 500)
+        gf.locate_point(minx, miny)
+        build.assert_not_called()
+    assert gf._spatial_index is index and gf.cache_stats.entries == 0
+
+
+def _cache_test_attrs(elr, num_vertices):
+    geometry = LineString([(i, 0) for i in range(num_vertices)])
+    vertices, cumulative = Geofurlong._line_arrays(geometry)
+    return ELR_Attributes(elr=elr, geometry=geometry, vertices=vertices, cumulative=cumulative)
+
+
+def test_elr_cache_max_entries():
+    gf = Geofurlong(cache_max_entries=2)
+    gf._elr_cache["AAA"] = _cache_test_attrs("AAA", 2)
+    gf._elr_cache["BBB"] = _cache_test_attrs("BBB", 2)
+
+    assert gf._load_elr("AAA").elr == "AAA"  # Now most recently used.
+    gf._elr_cache["CCC"] = _cache_test_attrs("CCC", 2)
+
+    assert "AAA" in gf._elr_cache and "BBB" not in gf._elr_cache and "CCC" in gf._elr_cache
+
+    stats = gf.cache_stats
+    assert (stats.hits, stats.evictions, stats.entries) == (1, 1, 2)
+
+
+def test_elr_cache_max_bytes():
+    gf = Geofurlong(cache_max_bytes=1_000)
+    attrs = _cache_test_attrs("AAA", 10)
+    size = (9 + 16 * 10) + 16 * 10 + 8 * 10
+    assert gf._elr_cache.estimate_bytes(attrs) == size
+
+    gf._elr_cache["AAA"] = attrs
+    gf._elr_cache["BBB"] = _cache_test_attrs("BBB", 10)
+    assert gf.cache_stats.memory_bytes == 2 * size
+
+    gf._elr_cache["CCC"] = _cache_test_attrs("CCC", 10)
+    assert "AAA" not in gf._elr_cache
+    assert gf.cache_stats.memory_bytes == 2 * size and gf.cache_stats.evictions == 1
+
+    # An ELR larger than the limit is still retained, as the only entry.
+    gf._elr_cache["DDD"] = _cache_test_attrs("DDD", 100)
+    assert len(gf._elr_cache) == 1 and "DDD" in gf._elr_cache
+
+
+def test_elr_cache_invalid_limits():
+    with pytest.raises(ValueError):
+        Geofurlong(cache_max_entries=0)
+
+    with pytest.raises(ValueError):
+        Geofurlong(cache_max_bytes=-1)
+
+
+def test_elr_lazy_decoding():
+    gf = Geofurlong()
+    elr = gf.elr_codes[0]
+
+    # Attribute-only access leaves the geometry as WKB and the calibration unloaded.
+    properties = gf.elr(elr)
+    assert properties.route is not None
+    attrs = gf._elr_cache[elr]
+    assert isinstance(attrs._geometry, bytes)
+    assert properties._geometry is attrs
+    assert attrs.calibration is None and attrs.vertices is None
+    memory_bytes = gf.cache_stats.memory_bytes
+
+    # Reading the geometry decodes it once, into the cached attributes.
+    assert isinstance(properties.geometry, shapely.geometry.LineString)
+    assert properties.geometry is properties.geometry is attrs._geometry
+
+    # Locating a mileage loads the calibration, and re-sizes the cached ELR.
+    gf.at(elr, attrs.ty_from)
+    assert attrs.calibration is not None and attrs.cumulative is not None
+    assert gf.cache_stats.memory_bytes > memory_bytes
+
+    # WKB may be given directly.
+    line = LineString([(0, 0), (3, 4)])
+    assert ELR_Attributes(geometry=shapely.wkb.dumps(line)).geometry.equals(line)
+    assert ELR_Attributes().geometry is None
+
+
+def test_elr_geometry_decoded_once(geofurlong_instance):
+    elrs = geofurlong_instance.elr_codes[:2]
+
+    with patch("shapely.wkb.loads", wraps=shapely.wkb.loads) as loads:
+        for _ in range(5):
+            for elr in elrs:
+                assert isinstance(geofurlong_instance.elr(elr).geometry, LineString)
+        assert loads.call_count == len(elrs)
+
+
+def test_preload(geofurlong_instance):
+    elrs = geofurlong_instance.elr_codes[:10]
+
+    preloaded = Geofurlong()
+    loaded = preloaded.preload(elrs)
+    assert loaded == len(preloaded._elr_cache) > 0
+
+    for elr in elrs:
+        try:
+            expected = geofurlong_instance._calibrate(geofurlong_instance._load_elr(elr))
+        except ValueError:
+            assert elr not in preloaded._elr_cache
+            continue
+
+        attrs = preloaded._elr_cache[elr]
+        assert attrs.calibration.dtype == expected.calibration.dtype
+        np.testing.assert_array_equal(attrs.calibration, expected.calibration)
+        assert attrs.geometry.equals(expected.geometry)
+        assert (attrs.ty_from, attrs.ty_to, attrs.formatted_range, attrs.trackmaps) == (
+            expected.ty_from,
+            expected.ty_to,
+            expected.formatted_range,
+            expected.trackmaps,
+        )
+
+    assert Geofurlong().preload([]) == 0
+
+    with pytest.raises(ValueError, match="Invalid ELR code"):
+        Geofurlong().preload(["abc"])
+
+
+def test_snapshot(geofurlong_instance, tmp_path):
+    snapshot_path = tmp_path / "snapshot"
+    geofurlong_instance.write_snapshot(snapshot_path)
+
+    gf = Geofurlong.from_snapshot(snapshot_path)
+    assert gf.db_version == geofurlong_instance.db_version
+    assert gf.elr_codes == geofurlong_instance.elr_codes
+    assert gf._geo_db is None
+
+    for elr in gf.elr_codes[:10]:
+        expected = geofurlong_instance.elr(elr)
+        assert gf.elr(elr) == expected
+
+        total_yards = geofurlong_instance.traverse_array(elr, 440)
+        expected_coords, expected_status = geofurlong_instance.locate_batch(np.full(len(total_yards), elr), total_yards)
+        coords, status = gf.locate_batch(np.full(len(total_yards), elr), total_yards)
+        np.testing.assert_array_equal(status, expected_status)
+        np.testing.assert_array_equal(coords, expected_coords)
+
+        located = np.flatnonzero(status == Geofurlong.STATUS_OK)
+        if len(located) > 0:
+            ty = int(total_yards[located[0]])
+            assert gf.at(elr, ty).equals(geofurlong_instance.at(elr, ty))
+
+            # Vertex arrays are views of the memory-mapped snapshot.
+            assert gf._elr_cache[elr].vertices.base is not None
+
+    with pytest.raises(ValueError, match="ELR not known"):
+        gf.elr("ZZZ9")
+
+
+def test_snapshot_invalid(geofurlong_instance, tmp_path):
+    with pytest.raises(ValueError, match="Not a complete snapshot"):
+        Geofurlong.from_snapshot(tmp_path)
+
+    geofurlong_instance.write_snapshot(tmp_path)
+    version_fn = tmp_path / "snapshot.json"
+    version_fn.write_text(version_fn.read_text().replace(f'"format_version": {_Snapshot.FORMAT_VERSION}', '"format_version": 999'))
+
+    with pytest.raises(ValueError, match="format version 999 is not supported"):
+        Geofurlong.from_snapshot(tmp_path)
+
+
+def _thread_results(gf, work):
+    """Locates each (ELR, total yards) item of work, returning co-ordinates or the error raised."""
+
+    results = []
+    for elr, ty in work:
+        try:
+            point = gf.at(elr, ty)
+            results.append((point.x, point.y))
+        except ValueError as e:
+            results.append(str(e))
+
+    return results
+
+
+@pytest.mark.parametrize("from_snapshot", [False, True])
+def test_thread_safe(geofurlong_instance, tmp_path, from_snapshot):
+    if from_snapshot:
+        geofurlong_instance.write_snapshot(tmp_path)
+        gf = ThreadSafeGeofurlong.from_snapshot(tmp_path)
+    else:
+        gf = ThreadSafeGeofurlong()
+
+    # Interleave ELRs so that threads continually switch between them.
+    work = [(elr, ty) for ty in range(0, 20_000, 97) for elr in gf.elr_codes[:10]]
+    chunks = [work[i::8] for i in range(8)]
+    expected = [_thread_results(geofurlong_instance, chunk) for chunk in chunks]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(lambda chunk: _thread_results(gf, chunk), chunks)) == expected
+
+        elrs = np.array([elr for elr, _ in work])
+        total_yards = np.array([ty for _, ty in work])
+        expected_coords, expected_status = geofurlong_instance.locate_batch(elrs, total_yards)
+        for coords, status in executor.map(lambda _: gf.locate_batch(elrs, total_yards), range(8)):
+            np.testing.assert_array_equal(status, expected_status)
+            np.testing.assert_array_equal(coords, expected_coords)
+
+        # Each thread has its own current ELR and database connection.
+        gf.elr(gf.elr_codes[0])
+        other_elr, other_db = executor.submit(lambda: (gf.elr(gf.elr_codes[1]).elr, gf._geo_db)).result()
+        assert (gf._elr_attrs.elr, other_elr) == (gf.elr_codes[0], gf.elr_codes[1])
+        if from_snapshot:
+            assert other_db is None and gf._geo_db is None
+        else:
+            assert other_db is not gf._geo_db
+
+    assert gf.cache_stats.entries <= len(gf.elr_codes)
+
+
+@pytest.mark.parametrize("from_snapshot", [False, True])
+def test_parallel(geofurlong_instance, tmp_path, from_snapshot):
+    if from_snapshot:
+        geofurlong_instance.write_snapshot(tmp_path)
+        gf = Geofurlong.from_snapshot(tmp_path)
+    else:
+        gf = Geofurlong()
+
+    rng = np.random.default_rng(0)
+    elrs = rng.choice(list(gf.elr_codes) + ["ZZZ9", "bad"], 5_000)
+    total_yards = rng.integers(0, 30_000, 5_000)
+
+    expected_coords, expected_status = geofurlong_instance.locate_batch(elrs, total_yards, lon_lat=True)
+    coords, status = gf.parallel_locate(elrs, total_yards, lon_lat=True, processes=2, chunk_size=999)
+    np.testing.assert_array_equal(status, expected_status)
+    np.testing.assert_array_equal(coords, expected_coords)
+
+    coords, status = gf.parallel_locate(elrs[:0], total_yards[:0], processes=2)
+    assert coords.shape == (0, 2) and len(status) == 0
+
+    # Calibrated ELRs without gaps, in an order other than sorted.
+    elrs = [elr for elr in reversed(gf.elr_codes) if elr not in ("GAP", "NOC")]
+    traversals = list(gf.parallel_traverse(elrs, 440, processes=2))
+    assert [points.elr for points in traversals] == elrs
+    for points in traversals:
+        (expected,) = geofurlong_instance.traverse_points(points.elr, 440, chunk_size=100_000)
+        for column in ("total_yards", "easting", "northing", "longitude", "latitude"):
+            np.testing.assert_array_equal(getattr(points, column), getattr(expected, column))
+
+    # All ELRs are validated when called, before any results are consumed.
+    with pytest.raises(ValueError, match="ELR not known"):
+        gf.parallel_traverse(elrs + ["ZZZ9"], 440, processes=2)
+    with pytest.raises(ValueError, match="No calibration data for NOC"):
+        gf.parallel_traverse(elrs + ["NOC"], 440, processes=2)
+    with pytest.raises(ValueError, match="GAP"):
+        gf.parallel_traverse(elrs + ["GAP"], 440, processes=2)
+
+    with pytest.raises(ValueError, match="equal length"):
+        gf.parallel_locate(elrs, [0])
+
+    if not from_snapshot:
+        # The snapshot published to the worker processes is compiled from the database once per instance.
+        with patch("geofurlong._Snapshot.build", wraps=_Snapshot.build) as build:
+            gf = Geofurlong()
+            for _ in range(2):
+                gf.parallel_locate(elrs, np.zeros(len(elrs), dtype=np.int64), processes=2)
+            list(gf.parallel_traverse(elrs[:1], 440, processes=2))
+        assert build.call_count == 1
+
+
+def test_async(geofurlong_instance):
+    work = [(elr, ty) for elr in list(geofurlong_instance.elr_codes) + ["ZZZ9", "bad"] for ty in range(-100, 20_000, 333)]
+
+    def expected(elr, ty, lon_lat):
+        try:
+            return geofurlong_instance.at(elr, ty, lon_lat)
+        except ValueError as e:
+            return str(e)
+
+    async def at(gf, elr, ty, lon_lat):
+        try:
+            return await gf.at(elr, ty, lon_lat)
+        except ValueError as e:
+            return str(e)
+
+    async def main():
+        async with AsyncGeofurlong(max_batch_size=100) as gf:
+            with patch.object(gf.geofurlong, "locate_batch", wraps=gf.geofurlong.locate_batch) as locate_batch:
+                for lon_lat in (False, True):
+                    results = await asyncio.gather(*[at(gf, elr, ty, lon_lat) for elr, ty in work])
+                    for (elr, ty), result in zip(work, results):
+                        assert result == expected(elr, ty, lon_lat)
+
+                # Concurrent requests are coalesced into full batches.
+                assert locate_batch.call_count == 2 * -(-len(work) // 100)
+
+            elr = geofurlong_instance.elr_codes[-1]
+            assert await gf.elr(elr) == geofurlong_instance.elr(elr)
+            assert (await gf.between(elr, 0, 1_000)).equals(geofurlong_instance.between(elr, 0, 1_000))
+            np.testing.assert_array_equal(await gf.traverse_array(elr, 440), geofurlong_instance.traverse_array(elr, 440))
+
+            with pytest.raises(ValueError, match="ELR not known"):
+                await gf.elr("ZZZ9")
+
+    asyncio.run(main())
+
+
+def test_async_backpressure(geofurlong_instance):
+    lock = threading.Lock()
+    in_progress = []
+    peak = []
+
+    def slow_elr(elr):
+        with lock:
+            in_progress.append(elr)
+            peak.append(len(in_progress))
+        time.sleep(0.01)
+        with lock:
+            in_progress.remove(elr)
+        return elr
+
+    async def main():
+        async with AsyncGeofurlong(geofurlong_instance, max_workers=8, max_pending=3) as gf:
+            with patch.object(gf.geofurlong, "elr", side_effect=slow_elr):
+                assert await asyncio.gather(*[gf.elr(str(i)) for i in range(20)]) == [str(i) for i in range(20)]
+
+    asyncio.run(main())
+    assert max(peak) == 3
+
+    with pytest.raises(ValueError, match="must be above zero"):
+        AsyncGeofurlong(geofurlong_instance, max_pending=0)
+
+
+def test_http_server(geofurlong_instance):
+    elr = geofurlong_instance.elr_codes[-1]
+    point = geofurlong_instance.at(elr, 1_000, lon_lat=True)
+    coords, status = geofurlong_instance.locate_batch([elr, "ZZZ9"], [1_000, 1_000])
+
+    def requests(port):
+        # Each request is sent over the same keep-alive connection.
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        responses = []
+        for method, target, body in (
+            ("GET", f"/at?elr={elr}&ty=1000&lon_lat=true", None),
+            ("GET", f"/between?elr={elr}&from=0&to=1000", None),
+            ("GET", f"/traverse?elr={elr}&interval=440", None),
+            ("POST", "/batch", json.dumps({"elrs": [elr, "ZZZ9"], "ty": [1_000, 1_000]})),
+            ("GET", "/health", None),
+            ("GET", f"/at?elr={elr}", None),
+            ("GET", "/at?elr=ZZZ9&ty=0", None),
+            ("POST", f"/at?elr={elr}&ty=0", None),
+            ("GET", "/unknown", None),
+        ):
+            connection.request(method, target, body)
+            response = connection.getresponse()
+            responses.append((response.status, json.loads(response.read())))
+        connection.close()
+        return responses
+
+    async def main():
+        async with AsyncGeofurlong(ThreadSafeGeofurlong()) as gf:
+            server = await _HTTP_Server(gf).start("127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                return await asyncio.get_running_loop().run_in_executor(None, requests, port)
+
+    at, between, traverse, batch, health, missing, unknown_elr, wrong_method, unknown_endpoint = asyncio.run(main())
+
+    assert at == (200, {"elr": elr, "ty": 1_000, "x": point.x, "y": point.y})
+    assert between[0] == 200
+    assert shapely.from_geojson(json.dumps(between[1]["geometry"])).equals(geofurlong_instance.between(elr, 0, 1_000))
+    assert traverse[0] == 200 and traverse[1]["ty"] == geofurlong_instance.traverse_array(elr, 440).tolist()
+    np.testing.assert_array_equal(traverse[1]["coordinates"], geofurlong_instance.at_many(elr, geofurlong_instance.traverse_array(elr, 440)))
+    assert batch == (200, {"coordinates": [coords[0].tolist(), None], "status": status.tolist()})
+    assert health == (200, {"api_version": Geofurlong.API_VERSION, "db_version": geofurlong_instance.db_version})
+    assert missing == (400, {"error": "Missing parameter: ty"})
+    assert unknown_elr == (400, {"error": "ELR not known: ZZZ9"})
+    assert wrong_method[0] == 405
+    assert unknown_endpoint[0] == 404
+
+
+def test_http_server_errors(geofurlong_instance):
+    elr = geofurlong_instance.elr_codes[-1]
+
+    def requests(port):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        responses = []
+        for method, target, body in (
+            ("GET", f"/between?elr={elr}&from=0&to=1000", None),
+            ("GET", "/health", None),
+            ("POST", "/batch", json.dumps({"elrs": [elr] * 10, "ty": [1_000] * 10})),
+        ):
+            connection.request(method, target, body)
+            response = connection.getresponse()
+            responses.append((response.status, json.loads(response.read()), response.getheader("Connection")))
+        connection.close()
+
+        # Requests which cannot be read are refused, each closing its connection.
+        for headers in ({"X-Long": "x" * 100_000}, {"Transfer-Encoding": "chunked"}):
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            connection.request("POST", "/batch", headers=headers)
+            response = connection.getresponse()
+            responses.append((response.status, json.loads(response.read()), response.getheader("Connection")))
+            connection.close()
+
+        return responses
+
+    async def failing_between(*args):
+        raise RuntimeError("failed")
+
+    async def main():
+        async with AsyncGeofurlong(ThreadSafeGeofurlong()) as gf:
+            gf.between = failing_between
+            server = await _HTTP_Server(gf, max_body_bytes=64).start("127.0.0.1", 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                return await asyncio.get_running_loop().run_in_executor(None, requests, port)
+
+    failed, health, too_large, long_header, chunked = asyncio.run(main())
+
+    # An unexpected failure of a handler is reported as JSON, leaving the connection open for further requests.
+    assert failed == (500, {"error": "Internal error: RuntimeError"}, "keep-alive")
+    assert health[0] == 200
+
+    # A body above the limit is refused without being read, closing the connection.
+    assert too_large == (413, {"error": "Request body exceeds 64 bytes"}, "close")
+    assert long_header == (431, {"error": "Request header fields too large"}, "close")
+    assert chunked == (501, {"error": "Transfer-Encoding is not supported"}, "close")
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_geojson_writer(geofurlong_instance, tmp_path, ndjson):
+    elr = geofurlong_instance.elr_codes[-1]
+    geojson_fn = tmp_path / "out.geojson"
+
+    with GeoJSON_Writer(geojson_fn, ndjson=ndjson) as writer:
+        for points in geofurlong_instance.traverse_points(elr, 440, chunk_size=5):
+            writer.write_points(points)
+        writer.write_geometry(geofurlong_instance.at(elr, 100, lon_lat=True), {"name": "at"})
+        writer.write_geometry(geofurlong_instance.between(elr, 0, 1_000, lon_lat=True))
+        writer.write_coordinates(np.array([[1.0, 2.0], [np.nan, np.nan]]), {"id": np.array([1, 2])})
+
+    text = geojson_fn.read_text()
+    features = [json.loads(line) for line in text.splitlines()] if ndjson else json.loads(text)["features"]
+    assert len(features) == writer.count
+
+    points = next(geofurlong_instance.traverse_points(elr, 440, chunk_size=100_000))
+    assert len(features) == len(points.total_yards) + 3
+    for feature, total_yards, longitude, latitude in zip(features, points.total_yards, points.longitude, points.latitude):
+        mileage = Geofurlong.format_total_yards(int(total_yards))
+        assert feature["properties"] == {"elr": elr, "total_yards": int(total_yards), "mileage": mileage, "elr_mileage": f"{elr} {mileage}"}
+        assert feature["geometry"] == {"type": "Point", "coordinates": [round(longitude, 7), round(latitude, 7)]}
+
+    at, between, coordinates = features[-3:]
+    assert at["properties"] == {"name": "at"}
+    assert between["properties"] == {} and between["geometry"]["type"] == "LineString"
+    np.testing.assert_allclose(between["geometry"]["coordinates"], geofurlong_instance.between(elr, 0, 1_000, lon_lat=True).coords, atol=1e-7)
+    assert coordinates == {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1.0, 2.0]}, "properties": {"id": 1}}
+
+
+def test_geojson_writer_planar(tmp_path):
+    geojson_fn = tmp_path / "out.geojson"
+
+    with GeoJSON_Writer(geojson_fn, lon_lat=False) as writer:
+        writer.write_geometry(Point(530_034.12345, 180_381.6789))
+        with pytest.raises(ValueError, match="does not have a value"):
+            writer.write_coordinates(np.zeros((2, 2)), {"id": [1]})
+
+    collection = json.loads(geojson_fn.read_text())
+    assert collection["crs"]["properties"]["name"] == "urn:ogc:def:crs:EPSG::27700"
+    assert collection["features"][0]["geometry"]["coordinates"] == [530_034.123, 180_381.679]
+
+    with pytest.raises(ValueError, match="precision"):
+        GeoJSON_Writer(tmp_path / "invalid.geojson", precision=-1)
+
+
+def test_traverse_arrow(geofurlong_instance):
+    pytest.importorskip("pyarrow")
+
+    elr = geofurlong_instance.elr_codes[-1]
+    batches = list(geofurlong_instance.traverse_arrow(elr, 110, chunk_size=50))
+    chunks = list(geofurlong_instance.traverse_points(elr, 110, chunk_size=50))
+    assert len(batches) == len(chunks)
+
+    for batch, points in zip(batches, chunks):
+        assert tuple(batch.schema.names) == Geofurlong.ARROW_COLUMNS
+        assert batch.column("elr").to_pylist() == [elr] * len(points.total_yards)
+        assert batch.column("total_yards").to_pylist() == points.total_yards.tolist()
+        assert batch.column("mileage").to_pylist() == [Geofurlong.format_total_yards(ty) for ty in points.total_yards.tolist()]
+        for column, expected in (("x", points.easting), ("y", points.northing), ("lon", points.longitude), ("lat", points.latitude)):
+            np.testing.assert_array_equal(batch.column(column).to_numpy(), expected)
+
+        geographic = shapely.points(np.column_stack((points.longitude, points.latitude)))
+        assert batch.column("geometry").to_pylist() == shapely.to_wkb(geographic).tolist()
+
+
+def test_arrow_zero_copy(geofurlong_instance):
+    pytest.importorskip("pyarrow")
+
+    # The column arrays of points are contiguous, so the numeric Arrow columns share their buffers.
+    elr = geofurlong_instance.elr_codes[-1]
+    points = next(geofurlong_instance.traverse_points(elr, 110))
+    columns = (points.easting, points.northing, points.longitude, points.latitude)
+    assert all(column.flags.c_contiguous for column in columns)
+
+    mileages = [Geofurlong.format_total_yards(ty) for ty in points.total_yards.tolist()]
+    batch = Geofurlong._arrow_batch([elr] * len(mileages), points.total_yards, mileages, *columns)
+    for name, column in zip(("x", "y", "lon", "lat"), columns):
+        assert np.shares_memory(batch.column(name).to_numpy(), column)
+    assert np.shares_memory(batch.column("total_yards").to_numpy(), points.total_yards)
+
+    coords, _ = geofurlong_instance.locate_batch(np.array([elr, elr]), np.array([1_000, 2_000]), lon_lat=True)
+    assert coords[:, 0].flags.c_contiguous and coords[:, 1].flags.c_contiguous
+
+
+def test_locate_batch_arrow(geofurlong_instance):
+    pytest.importorskip("pyarrow")
+
+    elrs = np.array(list(geofurlong_instance.elr_codes) + ["ZZZ9", "bad"])
+    total_yards = np.full(len(elrs), 1_000)
+    batch = geofurlong_instance.locate_batch_arrow(elrs, total_yards)
+    coords, status = geofurlong_instance.locate_batch(elrs, total_yards)
+    located = status == Geofurlong.STATUS_OK
+    assert located.any() and not located.all()
+
+    assert tuple(batch.schema.names) == Geofurlong.ARROW_COLUMNS + ("status",)
+    assert batch.column("status").to_pylist() == status.tolist()
+    np.testing.assert_array_equal(batch.column("x").to_numpy(), coords[:, 0])
+    np.testing.assert_array_equal(batch.column("lon").to_numpy()[~located], np.nan)
+
+    geometries = batch.column("geometry").to_pylist()
+    mileages = batch.column("mileage").to_pylist()
+    for elr, row_located, geometry, mileage in zip(elrs, located, geometries, mileages):
+        if row_located:
+            assert shapely.from_wkb(geometry).equals(geofurlong_instance.at(elr, 1_000, lon_lat=True))
+            assert mileage == Geofurlong.format_linear(1_000, geofurlong_instance.elr(elr).metric)
+        else:
+            assert geometry is None and mileage is None
+
+    # Whole numbers of yards held as floats are accepted, whilst fractional or out of range mileages are not truncated.
+    from_floats = geofurlong_instance.locate_batch_arrow(elrs, total_yards.astype(float))
+    assert from_floats.schema.equals(batch.schema)
+    for name in ("total_yards", "mileage", "geometry", "status"):
+        assert from_floats.column(name).equals(batch.column(name))
+    for invalid in (np.full(len(elrs), 1_000.5), np.full(len(elrs), np.nan), np.full(len(elrs), 2**31), np.full(len(elrs), "1000")):
+        with pytest.raises(TypeError, match="whole numbers of yards"):
+            geofurlong_instance.locate_batch_arrow(elrs, invalid)
+
+
+def test_geoparquet_writer(geofurlong_instance, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    elr = geofurlong_instance.elr_codes[-1]
+    parquet_fn = tmp_path / "out.parquet"
+
+    with GeoParquet_Writer(parquet_fn, row_group_size=40) as writer:
+        for batch in geofurlong_instance.traverse_arrow(elr, 110, chunk_size=15):
+            writer.write(batch)
+
+    parquet_file = pq.ParquetFile(parquet_fn)
+    row_groups = [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.metadata.num_row_groups)]
+    assert sum(row_groups) == writer.count == len(geofurlong_instance.traverse_array(elr, 110))
+    assert all(rows == 40 for rows in row_groups[:-1]) and 0 < row_groups[-1] <= 40
+
+    assert json.loads(parquet_file.schema_arrow.metadata[b"geo"]) == GeoParquet_Writer.GEO_METADATA
+    table = parquet_file.read()
+    assert table.column("total_yards").to_pylist() == geofurlong_instance.traverse_array(elr, 110).tolist()
+
+    with pytest.raises(ValueError, match="row_group_size"):
+        GeoParquet_Writer(parquet_fn, row_group_size=0)
+
+
+def test_arrow_optional(geofurlong_instance, tmp_path):
+    # Without pyarrow installed, only the Arrow and GeoParquet output is unavailable.
+    with patch.dict(sys.modules, {"pyarrow": None}):
+        with pytest.raises(ImportError, match="optional pyarrow library"):
+            next(geofurlong_instance.traverse_arrow(geofurlong_instance.elr_codes[-1]))
+        with pytest.raises(ImportError, match="optional pyarrow library"):
+            GeoParquet_Writer(tmp_path / "out.parquet")
+
+
+def test_export_network(geofurlong_instance, tmp_path):
+    elrs = list(geofurlong_instance.elr_codes)
+    progress = []
+    manifest = geofurlong_instance.export_network(tmp_path, [440, 1_760], "ndjson", processes=2, progress=lambda *args: progress.append(args))
+
+    assert manifest["complete"] and manifest["db_version"] == geofurlong_instance.db_version
+    assert progress[-1] == (2 * len(elrs), 2 * len(elrs))
+    assert set(manifest["outputs"]) | set(manifest["failures"]) == {f"{interval:05d}/{elr}" for interval in (440, 1_760) for elr in elrs}
+    assert "00440/NOC" in manifest["failures"] and "00440/GAP" in manifest["failures"]
+    assert not (tmp_path / "00440" / "NOC.ndjson").exists()
+    assert json.loads((tmp_path / "manifest.json").read_text()) == manifest
+
+    for key, output in manifest["outputs"].items():
+        interval, elr = key.split("/")
+        lines = (tmp_path / f"{key}.ndjson").read_text().splitlines()
+        assert len(lines) == output["rows"] == len(geofurlong_instance.traverse_array(elr, int(interval)))
+
+    # Resuming regenerates only the removed file (and retries the failures).
+    removed_key, kept_key = sorted(manifest["outputs"])[:2]
+    (tmp_path / f"{removed_key}.ndjson").unlink()
+    kept_mtime = (tmp_path / f"{kept_key}.ndjson").stat().st_mtime_ns
+    (tmp_path / f"{removed_key}.ndjson.partial").write_text("interrupted")
+    (tmp_path / "01760" / "ZZZ9.ndjson.partial").write_text("interrupted")
+    progress.clear()
+
+    resumed = geofurlong_instance.export_network(tmp_path, [440, 1_760], "ndjson", processes=2, progress=lambda *args: progress.append(args))
+    assert resumed == manifest
+    assert progress[-1] == (1 + len(manifest["failures"]),) * 2
+    assert (tmp_path / f"{removed_key}.ndjson").exists()
+    assert (tmp_path / f"{kept_key}.ndjson").stat().st_mtime_ns == kept_mtime
+    assert not list(tmp_path.glob("**/*.partial"))
+
+    with pytest.raises(ValueError, match="in ndjson format, not version"):
+        geofurlong_instance.export_network(tmp_path, [440], "geojson")
+
+    # An interrupted export records the files completed before the interruption.
+    def interrupt(done, total):
+        if done == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        geofurlong_instance.export_network(tmp_path / "interrupted", [440], "ndjson", processes=2, progress=interrupt)
+
+    interrupted = json.loads((tmp_path / "interrupted" / "manifest.json").read_text())
+    assert not interrupted["complete"] and len(interrupted["outputs"]) + len(interrupted["failures"]) == 3
+
+    with pytest.raises(ValueError, match="Unknown export format"):
+        geofurlong_instance.export_network(tmp_path, [440], "csv")